@@ -0,0 +1,192 @@
+import copy
+import os
+import random
+import secrets
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import ecc_tool as ecc
+
+
+# Кривая воркера: восстанавливается один раз при запуске процесса
+_worker_curve = None
+
+
+def _pack(values, width):
+    """Целые числа фиксированной ширины (big-endian) подряд в одном буфере"""
+    return b''.join(v.to_bytes(width, 'big') for v in values)
+
+
+def _unpack(buffer, width):
+    return [int.from_bytes(buffer[i:i + width], 'big') for i in range(0, len(buffer), width)]
+
+
+def _curve_state(curve, G, n, table_path):
+    """Все, что нужно воркеру для восстановления кривой (без самой таблицы)"""
+    field = (curve.field.k, curve.field.c) if curve.field is not None else None
+    return (curve.a, curve.b, curve.p, curve._order, field,
+            curve.glv is not None, G, n, table_path)
+
+
+def _restore_curve(state):
+    a, b, p, group_order, field, glv, G, n, table_path = state
+    curve = ecc.EllipticCurve(a, b, p)
+    curve._order = group_order
+    if field is not None:
+        curve.field = ecc.SpecialPrimeField(*field)
+    if glv:
+        curve.setup_glv()
+    # Таблица базовой точки отображается в память из файла, а не строится заново
+    curve.load_base_point_table(table_path, n)
+    curve.G, curve.n = G, n
+    return curve
+
+
+def _init_worker(state):
+    global _worker_curve
+    _worker_curve = _restore_curve(state)
+
+
+def _keygen_chunk(count, seed):
+    """
+    Задание воркера: count пар ключей. Возвращает упакованные d, x, y.
+    d берутся из secrets; seed (не None) - воспроизводимые ключи только для тестов
+    """
+    curve = _worker_curve
+    n = curve.n
+    if seed is None:
+        privs = [1 + secrets.randbelow(n - 1) for _ in range(count)]
+    else:
+        rng = random.Random(seed)
+        privs = [rng.randrange(1, n) for _ in range(count)]
+    pubs = [ecc.point_multiply(curve, d, curve.G) for d in privs]
+    width = (curve.p.bit_length() + 7) // 8
+    return (_pack(privs, (n.bit_length() + 7) // 8),
+            _pack([P[0] for P in pubs], width),
+            _pack([P[1] for P in pubs], width))
+
+
+def _ecdh_chunk(privs, xs, ys):
+    """Задание воркера: x-координаты общих секретов d_i * H_i (упакованные)"""
+    curve = _worker_curve
+    width = (curve.p.bit_length() + 7) // 8
+    scalar_width = (curve.n.bit_length() + 7) // 8
+    shared = []
+    for d, x, y in zip(_unpack(privs, scalar_width), _unpack(xs, width), _unpack(ys, width)):
+        S = ecc.point_multiply(curve, d, (x, y))
+        if S is None:
+            raise ValueError("Общий секрет - точка в бесконечности")
+        shared.append(S[0])
+    return _pack(shared, width)
+
+
+def _base_point(curve, G, order):
+    G = G or getattr(curve, 'G', None)
+    if G is None:
+        raise ValueError("Не задана базовая точка G")
+    n = order or getattr(curve, 'n', None) or ecc.point_order(curve, G)
+    return G, n
+
+
+def _chunks(count, chunk_size):
+    return [min(chunk_size, count - i) for i in range(0, count, chunk_size)]
+
+
+def _run(curve, G, n, processes, jobs, work):
+    """
+    Выполняет задания jobs функцией work в пуле процессов (processes=1 - в текущем процессе).
+    Таблица базовой точки сохраняется во временный файл, который воркеры отображают в память.
+    Если у curve нет таблицы для G, она строится на копии curve
+    """
+    if curve.base_table is None or not curve.base_table.matches(G):
+        # Таблица для другой точки строится на копии: кривая вызывающего
+        # (в том числе общий экземпляр из ecc_curves.get_curve) не меняется
+        curve = copy.copy(curve)
+        curve.precompute_base_point(G, order=n)
+
+    if processes == 1:
+        global _worker_curve
+        local = copy.copy(curve)
+        local.G, local.n = G, n
+        saved, _worker_curve = _worker_curve, local
+        try:
+            return [work(*job) for job in jobs]
+        finally:
+            _worker_curve = saved
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'base.ecfb')
+        curve.base_table.save(path)
+        state = _curve_state(curve, G, n, path)
+        with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(state,)) as pool:
+            return list(pool.map(work, *zip(*jobs)))
+
+
+def _stats(count, start, processes):
+    seconds = time.perf_counter() - start
+    return {
+        'count': count,
+        'seconds': seconds,
+        'ops_per_second': count / seconds if seconds else float('inf'),
+        'processes': processes,
+    }
+
+
+def batch_keygen(curve, count, G=None, order=None, processes=None, chunk_size=512, seed=None):
+    """
+    Генерирует count пар ключей (d, d*G) в пуле процессов.
+    G и order по умолчанию берутся из curve.G и curve.n (кривые из ecc_curves).
+    Приватные ключи берутся из secrets (криптографический генератор);
+    seed задает воспроизводимые ключи через random.Random - только для тестов.
+    Возвращает (privs, pubs, stats), stats - число операций, время и ops/s
+    """
+    G, n = _base_point(curve, G, order)
+    processes = processes or os.cpu_count()
+    if seed is None:
+        jobs = [(size, None) for size in _chunks(count, chunk_size)]
+    else:
+        rng = random.Random(seed)
+        jobs = [(size, rng.getrandbits(128)) for size in _chunks(count, chunk_size)]
+
+    start = time.perf_counter()
+    results = _run(curve, G, n, processes, jobs, _keygen_chunk)
+
+    width = (curve.p.bit_length() + 7) // 8
+    scalar_width = (n.bit_length() + 7) // 8
+    privs, pubs = [], []
+    for d_buf, x_buf, y_buf in results:
+        privs.extend(_unpack(d_buf, scalar_width))
+        pubs.extend(zip(_unpack(x_buf, width), _unpack(y_buf, width)))
+    return privs, pubs, _stats(count, start, processes)
+
+
+def batch_ecdh(curve, privs, peer_pubs, G=None, order=None, processes=None, chunk_size=512):
+    """
+    Общие секреты ECDH: x-координаты d_i * H_i для пар (privs[i], peer_pubs[i]).
+    Возвращает (shared, stats)
+    """
+    if len(privs) != len(peer_pubs):
+        raise ValueError("Число приватных и публичных ключей должно совпадать")
+    G, n = _base_point(curve, G, order)
+    processes = processes or os.cpu_count()
+    width = (curve.p.bit_length() + 7) // 8
+    scalar_width = (n.bit_length() + 7) // 8
+
+    jobs = []
+    for i in range(0, len(privs), chunk_size):
+        pubs = peer_pubs[i:i + chunk_size]
+        for H in pubs:
+            if H is None or not curve.is_point_on_curve(*H):
+                raise ValueError(f"Публичный ключ не лежит на кривой: {H}")
+        jobs.append((_pack([d % n for d in privs[i:i + chunk_size]], scalar_width),
+                     _pack([H[0] % curve.p for H in pubs], width),
+                     _pack([H[1] % curve.p for H in pubs], width)))
+
+    start = time.perf_counter()
+    results = _run(curve, G, n, processes, jobs, _ecdh_chunk)
+
+    shared = []
+    for buf in results:
+        shared.extend(_unpack(buf, width))
+    return shared, _stats(len(privs), start, processes)
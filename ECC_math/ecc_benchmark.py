@@ -0,0 +1,314 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+import ecc_tool as ecc
+import ecc_curves
+import ecdlp
+from ecc_order import random_point
+
+
+# Кривая secp256k1: y² = x³ + 7 (mod p)
+SECP256K1_P = 2**256 - 2**32 - 977
+SECP256K1_G = (0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
+               0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8)
+
+
+def legacy_point_multiply(curve, k, P):
+    """Прежний алгоритм: двоичный метод справа налево в аффинных координатах"""
+    result = None
+    addend = P
+    while k:
+        if k & 1:
+            result = ecc.point_add(curve, result, addend)
+        addend = ecc.point_add(curve, addend, addend)
+        k >>= 1
+    return result
+
+
+def benchmark_variable_base(bits_list=(64, 128, 256), widths=(3, 4, 5, 6), trials=50):
+    """Сравнивает число групповых операций и время для умножения произвольной точки"""
+    curve = ecc.EllipticCurve(0, 7, SECP256K1_P)
+    # Произвольная (не базовая) точка
+    P = ecc.point_multiply(curve, 0xC0FFEE, SECP256K1_G)
+
+    methods = [('legacy', lambda k: legacy_point_multiply(curve, k, P)),
+               ('binary', lambda k: ecc.point_multiply(curve, k, P, method='binary'))]
+    for w in widths:
+        methods.append((f'wnaf-{w}', lambda k, w=w: ecc.point_multiply(curve, k, P, method='wnaf', width=w)))
+
+    print("=== УМНОЖЕНИЕ ПРОИЗВОЛЬНОЙ ТОЧКИ НА СКАЛЯР (secp256k1) ===\n")
+    results = {}
+    for bits in bits_list:
+        rng = random.Random(bits)
+        scalars = [rng.getrandbits(bits) | (1 << (bits - 1)) for _ in range(trials)]
+        print(f"Длина скаляра: {bits} бит")
+        print(f"   {'метод':<10} {'сложений':>10} {'удвоений':>10} {'всего':>10} {'мс/умн.':>10}")
+
+        for name, multiply in methods:
+            with curve.count_operations() as ops:
+                for k in scalars:
+                    multiply(k)
+            adds = ops.add / trials
+            doubles = ops.double / trials
+
+            start = time.perf_counter()
+            for k in scalars:
+                multiply(k)
+            elapsed = (time.perf_counter() - start) / trials * 1000
+
+            results[(bits, name)] = (adds, doubles, elapsed)
+            print(f"   {name:<10} {adds:>10.1f} {doubles:>10.1f} {adds + doubles:>10.1f} {elapsed:>10.3f}")
+        print()
+
+    return results
+
+
+def make_prime_order_curve(bits, rng):
+    """Случайная игрушечная кривая над bits-битным полем с простым порядком группы"""
+    while True:
+        p = rng.getrandbits(bits) | (1 << (bits - 1)) | 1
+        if not ecc.is_probable_prime(p):
+            continue
+        curve = ecc.EllipticCurve(rng.randrange(p), rng.randrange(p), p)
+        if (4 * curve.a**3 + 27 * curve.b**2) % p == 0:
+            continue
+        if ecc.is_probable_prime(curve.order()):
+            return curve, random_point(curve, rng)
+
+
+def benchmark_ecdlp(bits_list=(30, 36, 40), process_counts=None, seed=1):
+    """Время решения ECDLP методами BSGS, ρ и параллельным ρ для разного числа ядер"""
+    if process_counts is None:
+        cores = multiprocessing.cpu_count()
+        process_counts = sorted({1, 2, 4, cores} | {c for c in (8, 16) if c <= cores})
+
+    print("=== РЕШЕНИЕ ECDLP НА ИГРУШЕЧНЫХ КРИВЫХ ===\n")
+    rng = random.Random(seed)
+    results = {}
+    for bits in bits_list:
+        curve, G = make_prime_order_curve(bits, rng)
+        n = curve.order()
+        k = rng.randrange(1, n)
+        P = ecc.point_multiply(curve, k, G)
+        print(f"Поле {bits} бит, порядок группы n = {n}")
+
+        solvers = [('bsgs', lambda: ecdlp.bsgs(curve, G, P, n)),
+                   ('rho', lambda: ecdlp.pollard_rho(curve, G, P, n, seed=seed))]
+        for processes in process_counts:
+            solvers.append((f'rho-dp x{processes}',
+                            lambda processes=processes: ecdlp.parallel_pollard_rho(
+                                curve, G, P, n, processes=processes, seed=seed)))
+
+        for name, solve in solvers:
+            start = time.perf_counter()
+            found = solve()
+            elapsed = time.perf_counter() - start
+            assert found == k, f"{name}: найдено {found}, ожидалось {k}"
+            results[(bits, name)] = elapsed
+            print(f"   {name:<14} {elapsed:>8.2f} с")
+        print()
+
+    return results
+
+
+# Каталог визуализаторов (для замера перечисления точек и отрисовки)
+VISUALISE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ECC_visualise')
+
+# Размеры полей набора тестов: игрушечные простые и стандартные кривые до 521 бит
+SUITE_TOY_BITS = (16, 32, 64)
+SUITE_CURVES = ('P-192', 'secp256k1', 'P-256', 'P-384', 'P-521')
+SUITE_ENUMERATION_PRIMES = (11, 113, 9679)
+
+
+def _time_per_call(func, min_time=0.2, repeat=3):
+    """
+    Время одного вызова func (с): вызовы группируются так, чтобы замер длился
+    не меньше min_time, из repeat замеров берется наименьший
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / repeat:
+            break
+        number *= 2
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def _suite_curves(rng):
+    """(название, кривая, базовая точка, произвольная точка) для набора тестов"""
+    curves = []
+    for bits in SUITE_TOY_BITS:
+        # Порядок группы не нужен: достаточно случайной кривой и точки на ней
+        p = 4
+        while not ecc.is_probable_prime(p):
+            p = rng.getrandbits(bits) | (1 << (bits - 1)) | 1
+        curve = ecc.EllipticCurve(rng.randrange(p), rng.randrange(1, p), p)
+        G = random_point(curve, rng)
+        curve.precompute_base_point(G)
+        curves.append((f'toy{bits}', curve, G))
+    for name in SUITE_CURVES:
+        curve = ecc_curves.get_curve(name)
+        curves.append((name, curve, curve.G))
+    return [(name, curve, G, ecc.point_multiply(curve, 0xC0FFEE, G)) for name, curve, G in curves]
+
+
+def benchmark_core_operations(min_time=0.2, seed=1):
+    """point_add, point_multiply (базовая и произвольная точка) и sqrt_mod для разных размеров поля"""
+    rng = random.Random(seed)
+    results = {}
+    for name, curve, G, P in _suite_curves(rng):
+        k = rng.randrange(1, curve.p)
+        Q = ecc.point_multiply(curve, k, P)
+        square = Q[1] * Q[1] % curve.p
+        cases = {
+            'point_add': lambda: ecc.point_add(curve, P, Q),
+            'point_double': lambda: ecc.point_add(curve, P, P),
+            'point_multiply_base': lambda: ecc.point_multiply(curve, k, G),
+            'point_multiply': lambda: ecc.point_multiply(curve, k, P),
+            'sqrt_mod': lambda: curve.sqrt_mod(square, curve.p),
+        }
+        for op, func in cases.items():
+            results[f'core/{op}/{name}'] = _time_per_call(func, min_time)
+    return results
+
+
+def benchmark_enumeration(primes=SUITE_ENUMERATION_PRIMES, min_time=0.2):
+    """Перечисление всех точек кривой y² = x³ + 2x + 3 над F_p (как в визуализаторах)"""
+    sys.path.insert(0, VISUALISE_DIR)
+    from ecc_points import finite_field_points
+
+    return {f'enumeration/finite_field_points/p={p}': _time_per_call(lambda: finite_field_points(2, 3, p), min_time)
+            for p in primes}
+
+
+def benchmark_rendering():
+    """
+    Отрисовка каждого метода ECCVisualizer без окна (бэкенд Agg).
+    Рисунки сохраняются во временный каталог static/, каждый метод выполняется один раз
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    sys.path.insert(0, VISUALISE_DIR)
+    import matplotlib.pyplot as plt
+    from ecc_main import ECCVisualizer
+
+    cases = {
+        'plot_elliptic_curve': lambda v: v.plot_elliptic_curve(-1, 0, show_roots=True,
+                                                               save_path='static/test_function.png'),
+        'visualize_different_curve_types': lambda v: v.visualize_different_curve_types(),
+        'visualize_singular_curves': lambda v: v.visualize_singular_curves(),
+        'visualize_secp256k1': lambda v: v.visualize_secp256k1(),
+        'visualize_point_doubling': lambda v: v.visualize_point_doubling(),
+        'visualize_finite_field_curves': lambda v: v.visualize_finite_field_curves(),
+    }
+
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.mkdir(os.path.join(tmp, 'static'))
+        os.chdir(tmp)
+        try:
+            for name, render in cases.items():
+                start = time.perf_counter()
+                render(ECCVisualizer())
+                results[f'render/{name}'] = time.perf_counter() - start
+                plt.close('all')
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def run_suite(min_time=0.2, render=True):
+    """Весь набор тестов: словарь 'группа/операция/параметры' -> секунд на вызов"""
+    results = {}
+    results.update(benchmark_core_operations(min_time))
+    results.update(benchmark_enumeration(min_time=min_time))
+    if render:
+        results.update(benchmark_rendering())
+    return results
+
+
+def save_results(results, path):
+    """Результаты в JSON вместе с описанием окружения"""
+    data = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def compare_with_baseline(results, baseline_path, tolerance=0.25):
+    """
+    Сравнение с сохраненным эталоном: регрессия - если время выросло
+    больше чем в (1 + tolerance) раз. Таблица печатается в stderr (в stdout может идти JSON).
+    Возвращает список (тест, эталон, сейчас, отношение)
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)['results']
+
+    regressions = []
+    print(f"{'тест':<55} {'эталон, мс':>12} {'сейчас, мс':>12} {'отношение':>10}", file=sys.stderr)
+    for name in sorted(results):
+        if name not in baseline:
+            continue
+        ratio = results[name] / baseline[name]
+        mark = '  <-- регрессия' if ratio > 1 + tolerance else ''
+        print(f"{name:<55} {baseline[name] * 1000:>12.4f} {results[name] * 1000:>12.4f} {ratio:>10.2f}{mark}",
+              file=sys.stderr)
+        if mark:
+            regressions.append((name, baseline[name], results[name], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Тесты производительности ecc_tool и визуализаторов")
+    parser.add_argument('--suite', action='store_true',
+                        help="набор тестов с результатами в JSON (по умолчанию - прежние сравнения)")
+    parser.add_argument('--json', metavar='PATH', help="куда сохранить результаты набора")
+    parser.add_argument('--baseline', metavar='PATH', help="эталонные результаты для сравнения")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="допустимое относительное замедление (по умолчанию 0.25)")
+    parser.add_argument('--min-time', type=float, default=0.2, help="длительность замера одного теста, с")
+    parser.add_argument('--no-render', action='store_true', help="не замерять отрисовку")
+    args = parser.parse_args(argv)
+
+    if not args.suite:
+        benchmark_variable_base()
+        benchmark_ecdlp()
+        return 0
+
+    results = run_suite(args.min_time, render=not args.no_render)
+    if args.json:
+        save_results(results, args.json)
+    else:
+        json.dump(results, sys.stdout, indent=2, sort_keys=True)
+        print()
+    if args.baseline:
+        regressions = compare_with_baseline(results, args.baseline, args.tolerance)
+        if regressions:
+            print(f"\nРегрессий: {len(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
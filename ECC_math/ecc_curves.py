@@ -0,0 +1,198 @@
+import ecc_tool as ecc
+
+
+# Параметры стандартных кривых (SEC 2, FIPS 186-4, RFC 5639):
+# p, a, b, G = (x, y), n - порядок G, h - кофактор.
+# special = (k, c) задается для p = 2^k - c, где свертка вместо деления
+# (ecc.SpecialPrimeField) измеримо быстрее: P-384 и P-521. Для secp256k1,
+# P-192 и P-224 на Python она медленнее обычного %, и special не задается
+_CURVES = {
+    'secp256k1': dict(
+        p=2**256 - 2**32 - 977,
+        a=0,
+        b=7,
+        G=(0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
+           0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8),
+        n=0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141,
+        h=1,
+    ),
+    'secp192r1': dict(
+        p=2**192 - 2**64 - 1,
+        a=-3,
+        b=0x64210519E59C80E70FA7E9AB72243049FEB8DEECC146B9B1,
+        G=(0x188DA80EB03090F67CBF20EB43A18800F4FF0AFD82FF1012,
+           0x07192B95FFC8DA78631011ED6B24CDD573F977A11E794811),
+        n=0xFFFFFFFFFFFFFFFFFFFFFFFF99DEF836146BC9B1B4D22831,
+        h=1,
+    ),
+    'secp224r1': dict(
+        p=2**224 - 2**96 + 1,
+        a=-3,
+        b=0xB4050A850C04B3ABF54132565044B0B7D7BFD8BA270B39432355FFB4,
+        G=(0xB70E0CBD6BB4BF7F321390B94A03C1D356C21122343280D6115C1D21,
+           0xBD376388B5F723FB4C22DFE6CD4375A05A07476444D5819985007E34),
+        n=0xFFFFFFFFFFFFFFFFFFFFFFFFFFFF16A2E0B8F03E13DD29455C5C2A3D,
+        h=1,
+    ),
+    'secp256r1': dict(
+        p=2**256 - 2**224 + 2**192 + 2**96 - 1,
+        a=-3,
+        b=0x5AC635D8AA3A93E7B3EBBD55769886BC651D06B0CC53B0F63BCE3C3E27D2604B,
+        G=(0x6B17D1F2E12C4247F8BCE6E563A440F277037D812DEB33A0F4A13945D898C296,
+           0x4FE342E2FE1A7F9B8EE7EB4A7C0F9E162BCE33576B315ECECBB6406837BF51F5),
+        n=0xFFFFFFFF00000000FFFFFFFFFFFFFFFFBCE6FAADA7179E84F3B9CAC2FC632551,
+        h=1,
+    ),
+    'secp384r1': dict(
+        p=2**384 - 2**128 - 2**96 + 2**32 - 1,
+        a=-3,
+        b=int('B3312FA7E23EE7E4988E056BE3F82D19181D9C6EFE8141120314088F5013875A'
+              'C656398D8A2ED19D2A85C8EDD3EC2AEF', 16),
+        G=(int('AA87CA22BE8B05378EB1C71EF320AD746E1D3B628BA79B9859F741E082542A38'
+               '5502F25DBF55296C3A545E3872760AB7', 16),
+           int('3617DE4A96262C6F5D9E98BF9292DC29F8F41DBD289A147CE9DA3113B5F0B8C0'
+               '0A60B1CE1D7E819D7A431D7C90EA0E5F', 16)),
+        n=int('FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFC7634D81F4372DDF'
+              '581A0DB248B0A77AECEC196ACCC52973', 16),
+        h=1,
+        special=(384, 2**128 + 2**96 - 2**32 + 1),
+    ),
+    'secp521r1': dict(
+        p=2**521 - 1,
+        a=-3,
+        b=int('0051953EB9618E1C9A1F929A21A0B68540EEA2DA725B99B315F3B8B489918EF1'
+              '09E156193951EC7E937B1652C0BD3BB1BF073573DF883D2C34F1EF451FD46B503F00', 16),
+        G=(int('00C6858E06B70404E9CD9E3ECB662395B4429C648139053FB521F828AF606B4D'
+               '3DBAA14B5E77EFE75928FE1DC127A2FFA8DE3348B3C1856A429BF97E7E31C2E5BD66', 16),
+           int('011839296A789A3BC0045C8A5FB42C7D1BD998F54449579B446817AFBD17273E'
+               '662C97EE72995EF42640C550B9013FAD0761353C7086A272C24088BE94769FD16650', 16)),
+        n=int('01FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF'
+              'FA51868783BF2F966B7FCC0148F709A5D03BB5C9B8899C47AEBB6FB71E91386409', 16),
+        h=1,
+        special=(521, 1),
+    ),
+    'brainpoolP160r1': dict(
+        p=0xE95E4A5F737059DC60DFC7AD95B3D8139515620F,
+        a=0x340E7BE2A280EB74E2BE61BADA745D97E8F7C300,
+        b=0x1E589A8595423412134FAA2DBDEC95C8D8675E58,
+        G=(0xBED5AF16EA3F6A4F62938C4631EB5AF7BDBCDBC3,
+           0x1667CB477A1A8EC338F94741669C976316DA6321),
+        n=0xE95E4A5F737059DC60DF5991D45029409E60FC09,
+        h=1,
+    ),
+    'brainpoolP192r1': dict(
+        p=0xC302F41D932A36CDA7A3463093D18DB78FCE476DE1A86297,
+        a=0x6A91174076B1E0E19C39C031FE8685C1CAE040E5C69A28EF,
+        b=0x469A28EF7C28CCA3DC721D044F4496BCCA7EF4146FBF25C9,
+        G=(0xC0A0647EAAB6A48753B033C56CB0F0900A2F5C4853375FD6,
+           0x14B690866ABD5BB88B5F4828C1490002E6773FA2FA299B8F),
+        n=0xC302F41D932A36CDA7A3462F9E9E916B5BE8F1029AC4ACC1,
+        h=1,
+    ),
+    'brainpoolP224r1': dict(
+        p=0xD7C134AA264366862A18302575D1D787B09F075797DA89F57EC8C0FF,
+        a=0x68A5E62CA9CE6C1C299803A6C1530B514E182AD8B0042A59CAD29F43,
+        b=0x2580F63CCFE44138870713B1A92369E33E2135D266DBB372386C400B,
+        G=(0x0D9029AD2C7E5CF4340823B2A87DC68C9E4CE3174C1E6EFDEE12C07D,
+           0x58AA56F772C0726F24C6B89E4ECDAC24354B9E99CAA3F6D3761402CD),
+        n=0xD7C134AA264366862A18302575D0FB98D116BC4B6DDEBCA3A5A7939F,
+        h=1,
+    ),
+    'brainpoolP256r1': dict(
+        p=0xA9FB57DBA1EEA9BC3E660A909D838D726E3BF623D52620282013481D1F6E5377,
+        a=0x7D5A0975FC2C3057EEF67530417AFFE7FB8055C126DC5C6CE94A4B44F330B5D9,
+        b=0x26DC5C6CE94A4B44F330B5D9BBD77CBF958416295CF7E1CE6BCCDC18FF8C07B6,
+        G=(0x8BD2AEB9CB7E57CB2C4B482FFC81B7AFB9DE27E1E3BD23C23A4453BD9ACE3262,
+           0x547EF835C3DAC4FD97F8461A14611DC9C27745132DED8E545C1D54C72F046997),
+        n=0xA9FB57DBA1EEA9BC3E660A909D838D718C397AA3B561A6F7901E0E82974856A7,
+        h=1,
+    ),
+    'brainpoolP320r1': dict(
+        p=0xD35E472036BC4FB7E13C785ED201E065F98FCFA6F6F40DEF4F92B9EC7893EC28FCD412B1F1B32E27,
+        a=0x3EE30B568FBAB0F883CCEBD46D3F3BB8A2A73513F5EB79DA66190EB085FFA9F492F375A97D860EB4,
+        b=0x520883949DFDBC42D3AD198640688A6FE13F41349554B49ACC31DCCD884539816F5EB4AC8FB1F1A6,
+        G=(0x43BD7E9AFB53D8B85289BCC48EE5BFE6F20137D10A087EB6E7871E2A10A599C710AF8D0D39E20611,
+           0x14FDD05545EC1CC8AB4093247F77275E0743FFED117182EAA9C77877AAAC6AC7D35245D1692E8EE1),
+        n=0xD35E472036BC4FB7E13C785ED201E065F98FCFA5B68F12A32D482EC7EE8658E98691555B44C59311,
+        h=1,
+    ),
+    'brainpoolP384r1': dict(
+        p=int('8CB91E82A3386D280F5D6F7E50E641DF152F7109ED5456B412B1DA197FB71123'
+              'ACD3A729901D1A71874700133107EC53', 16),
+        a=int('7BC382C63D8C150C3C72080ACE05AFA0C2BEA28E4FB22787139165EFBA91F90F'
+              '8AA5814A503AD4EB04A8C7DD22CE2826', 16),
+        b=int('04A8C7DD22CE28268B39B55416F0447C2FB77DE107DCD2A62E880EA53EEB62D5'
+              '7CB4390295DBC9943AB78696FA504C11', 16),
+        G=(int('1D1C64F068CF45FFA2A63A81B7C13F6B8847A3E77EF14FE3DB7FCAFE0CBD10E8'
+               'E826E03436D646AAEF87B2E247D4AF1E', 16),
+           int('8ABE1D7520F9C2A45CB1EB8E95CFD55262B70B29FEEC5864E19C054FF9912928'
+               '0E4646217791811142820341263C5315', 16)),
+        n=int('8CB91E82A3386D280F5D6F7E50E641DF152F7109ED5456B31F166E6CAC0425A7'
+              'CF3AB6AF6B7FC3103B883202E9046565', 16),
+        h=1,
+    ),
+    'brainpoolP512r1': dict(
+        p=int('AADD9DB8DBE9C48B3FD4E6AE33C9FC07CB308DB3B3C9D20ED6639CCA70330871'
+              '7D4D9B009BC66842AECDA12AE6A380E62881FF2F2D82C68528AA6056583A48F3', 16),
+        a=int('7830A3318B603B89E2327145AC234CC594CBDD8D3DF91610A83441CAEA9863BC'
+              '2DED5D5AA8253AA10A2EF1C98B9AC8B57F1117A72BF2C7B9E7C1AC4D77FC94CA', 16),
+        b=int('3DF91610A83441CAEA9863BC2DED5D5AA8253AA10A2EF1C98B9AC8B57F1117A7'
+              '2BF2C7B9E7C1AC4D77FC94CADC083E67984050B75EBAE5DD2809BD638016F723', 16),
+        G=(int('81AEE4BDD82ED9645A21322E9C4C6A9385ED9F70B5D916C1B43B62EEF4D0098E'
+               'FF3B1F78E2D0D48D50D1687B93B97D5F7C6D5047406A5E688B352209BCB9F822', 16),
+           int('7DDE385D566332ECC0EABFA9CF7822FDF209F70024A57B1AA000C55B881F8111'
+               'B2DCDE494A5F485E5BCA4BD88A2763AED1CA2B2FA8F0540678CD1E0F3AD80892', 16)),
+        n=int('AADD9DB8DBE9C48B3FD4E6AE33C9FC07CB308DB3B3C9D20ED6639CCA70330870'
+              '553E5C414CA92619418661197FAC10471DB1D381085DDADDB58796829CA90069', 16),
+        h=1,
+    ),
+}
+
+# Альтернативные названия (NIST)
+_ALIASES = {
+    'P-192': 'secp192r1',
+    'P-224': 'secp224r1',
+    'P-256': 'secp256r1',
+    'P-384': 'secp384r1',
+    'P-521': 'secp521r1',
+}
+
+# Созданные кривые кэшируются вместе с таблицами базовой точки
+_instances = {}
+
+
+def available_curves():
+    """Названия кривых в реестре"""
+    return list(_CURVES) + list(_ALIASES)
+
+
+def get_curve(name, window=4):
+    """
+    Стандартная кривая по названию. У кривой заданы name, G, n, h и порядок
+    группы n*h; для G сразу строится таблица фиксированной базы (ширина окна window),
+    для кривых с a = 0 подключается эндоморфизм GLV.
+    Экземпляры кэшируются по названию и window
+    """
+    name = _ALIASES.get(name, name)
+    if name not in _CURVES:
+        raise ValueError(f"Неизвестная кривая: {name}")
+    if (name, window) in _instances:
+        return _instances[name, window]
+
+    params = _CURVES[name]
+    p = params['p']
+    curve = ecc.EllipticCurve(params['a'] % p, params['b'], p)
+    curve.name = name
+    curve.G = params['G']
+    curve.n = params['n']
+    curve.h = params['h']
+    curve._order = curve.n * curve.h
+    if 'special' in params:
+        curve.field = ecc.SpecialPrimeField(*params['special'])
+    curve.precompute_base_point(curve.G, window, curve.n)
+    if curve.a == 0:
+        # secp256k1: эндоморфизм (x, y) -> (beta*x, y) ускоряет умножение произвольной точки
+        curve.setup_glv()
+
+    _instances[name, window] = curve
+    return curve
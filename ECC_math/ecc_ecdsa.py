@@ -0,0 +1,129 @@
+import hashlib
+import hmac
+import secrets
+
+import ecc_tool as ecc
+
+
+# Кривая должна иметь базовую точку G, ее порядок n и кофактор h (см. ecc_curves)
+
+
+def generate_keypair(curve):
+    """Пара ключей (d, Q = d*G), d - случайное из [1, n-1]"""
+    d = 1 + secrets.randbelow(curve.n - 1)
+    return d, ecc.point_multiply(curve, d, curve.G)
+
+
+def _bits2int(data, n):
+    """Левые n.bit_length() бит строки data как целое (RFC 6979, 2.3.2)"""
+    e = int.from_bytes(data, 'big')
+    excess = len(data) * 8 - n.bit_length()
+    return e >> excess if excess > 0 else e
+
+
+def hash_message(curve, message, hashfunc=hashlib.sha256):
+    """Хеш сообщения, усеченный до длины n"""
+    return _bits2int(hashfunc(message).digest(), curve.n)
+
+
+def _rfc6979_nonce(n, d, digest, hashfunc):
+    """Детерминированный одноразовый ключ k по RFC 6979 (HMAC-DRBG от d и хеша сообщения)"""
+    size = (n.bit_length() + 7) // 8
+    x = d.to_bytes(size, 'big')
+    h = (_bits2int(digest, n) % n).to_bytes(size, 'big')
+    V = b'\x01' * hashfunc().digest_size
+    K = b'\x00' * hashfunc().digest_size
+    K = hmac.new(K, V + b'\x00' + x + h, hashfunc).digest()
+    V = hmac.new(K, V, hashfunc).digest()
+    K = hmac.new(K, V + b'\x01' + x + h, hashfunc).digest()
+    V = hmac.new(K, V, hashfunc).digest()
+    while True:
+        T = b''
+        while len(T) < size:
+            V = hmac.new(K, V, hashfunc).digest()
+            T += V
+        k = _bits2int(T, n)
+        if 1 <= k < n:
+            return k
+        K = hmac.new(K, V + b'\x00', hashfunc).digest()
+        V = hmac.new(K, V, hashfunc).digest()
+
+
+def sign(curve, d, message, hashfunc=hashlib.sha256):
+    """
+    Подпись ECDSA (r, s) сообщения message (bytes) приватным ключом d.
+    k детерминирован (RFC 6979). Подпись нормализуется так, чтобы точка
+    R = u1*G + u2*Q, восстанавливаемая при проверке, имела четную y:
+    (r, s) и (r, n - s) обе верны, а четность позволяет batch_verify
+    восстановить R по одному r
+    """
+    n = curve.n
+    digest = hashfunc(message).digest()
+    e = _bits2int(digest, n)
+    k = _rfc6979_nonce(n, d, digest, hashfunc)
+    while True:
+        R = ecc.point_multiply(curve, k, curve.G)
+        r = R[0] % n
+        s = pow(k, -1, n) * (e + r * d) % n
+        if r and s:
+            break
+        k = k + 1 if k + 1 < n else 1
+    if R[1] & 1:
+        s = n - s
+    return r, s
+
+
+def verify(curve, Q, message, signature, hashfunc=hashlib.sha256):
+    """
+    Проверка подписи: x(u1*G + u2*Q) ≡ r (mod n), u1 = e/s, u2 = r/s.
+    u1*G + u2*Q вычисляется одним двухскалярным умножением (метод Шамира)
+    """
+    n = curve.n
+    r, s = signature
+    if not (0 < r < n and 0 < s < n):
+        return False
+    if Q is None or not curve.is_point_on_curve(*Q):
+        return False
+    e = hash_message(curve, message, hashfunc)
+    w = pow(s, -1, n)
+    R = ecc.multi_scalar_multiply(curve, [e * w % n, r * w % n], [curve.G, Q])
+    return R is not None and R[0] % n == r
+
+
+def batch_verify(curve, items, hashfunc=hashlib.sha256):
+    """
+    Проверка многих подписей сразу. items - последовательность (Q, message, (r, s)).
+    Для каждой подписи R_i = u1_i*G + u2_i*Q_i восстанавливается по r_i (y четна,
+    см. sign), и со случайными 128-битными z_i проверяется одно равенство
+        (sum z_i*u1_i)*G + sum (z_i*u2_i)*Q_i - sum z_i*R_i = O
+    одним мультискалярным умножением. Коэффициенты при повторяющихся ключах Q
+    складываются. Если равенство не выполнено (есть неверная или
+    ненормализованная подпись), подписи проверяются по отдельности.
+    Возвращает True, если верны все подписи
+    """
+    n, p = curve.n, curve.p
+    coef_G = 0
+    coef_Q = {}
+    scalars, points = [], []
+    for Q, message, (r, s) in items:
+        if not (0 < r < n and 0 < s < n) or Q is None or not curve.is_point_on_curve(*Q):
+            return False
+        ys = curve.get_y(r)
+        if not ys:
+            break
+        R = (r, ys[0] if ys[0] % 2 == 0 else ys[1 % len(ys)])
+        z = 1 + secrets.randbits(128)
+        w = pow(s, -1, n)
+        coef_G += z * hash_message(curve, message, hashfunc) * w
+        key = (Q[0] % p, Q[1] % p)
+        coef_Q[key] = (coef_Q.get(key, 0) + z * r * w) % n
+        scalars.append(-z)
+        points.append(R)
+    else:
+        scalars += [coef_G % n] + list(coef_Q.values())
+        points += [curve.G] + list(coef_Q)
+        S = ecc.multi_scalar_multiply(curve, scalars, points)
+        if ecc.point_multiply(curve, getattr(curve, 'h', 1), S) is None:
+            return True
+
+    return all(verify(curve, Q, message, signature, hashfunc) for Q, message, signature in items)
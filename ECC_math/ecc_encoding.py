@@ -0,0 +1,224 @@
+import mmap
+
+import ecc_tool as ecc
+
+
+class Point:
+    """
+    Компактная аффинная точка (без __dict__). Ведет себя как кортеж (x, y):
+    индексация, распаковка, сравнение и хеш совпадают с кортежем, поэтому
+    Point можно передавать во все функции ecc_tool. Точка в бесконечности - None
+    """
+
+    __slots__ = ('x', 'y')
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+    def __getitem__(self, i):
+        return (self.x, self.y)[i]
+
+    def __len__(self):
+        return 2
+
+    def __iter__(self):
+        yield self.x
+        yield self.y
+
+    def __eq__(self, other):
+        if isinstance(other, (Point, tuple)):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.x, self.y))
+
+    def __repr__(self):
+        return f"Point({self.x}, {self.y})"
+
+
+def _width(p):
+    return (p.bit_length() + 7) // 8
+
+
+class PointArray:
+    """
+    Массив точек в одном буфере байтов: x и y фиксированной ширины (big-endian),
+    точка в бесконечности кодируется x = p (как в FixedBaseTable).
+    Буфером может быть bytes, bytearray, memoryview или mmap - данные не копируются
+    """
+
+    def __init__(self, p, buffer=None):
+        self.p = p
+        self.width = _width(p)
+        self._buffer = bytearray() if buffer is None else buffer
+        if len(self._buffer) % (2 * self.width):
+            raise ValueError("Размер буфера не кратен размеру точки")
+
+    @classmethod
+    def from_points(cls, p, points):
+        array = cls(p)
+        array.extend(points)
+        return array
+
+    @classmethod
+    def load(cls, p, path):
+        """Отображает файл в память (только чтение)"""
+        with open(path, 'rb') as f:
+            return cls(p, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self._buffer)
+
+    def tobytes(self):
+        return bytes(self._buffer)
+
+    def _pack(self, P):
+        w = self.width
+        if P is None:
+            return self.p.to_bytes(w, 'big') + bytes(w)
+        return (P[0] % self.p).to_bytes(w, 'big') + (P[1] % self.p).to_bytes(w, 'big')
+
+    def append(self, P):
+        self._buffer += self._pack(P)
+
+    def extend(self, points):
+        self._buffer += b''.join(self._pack(P) for P in points)
+
+    def __len__(self):
+        return len(self._buffer) // (2 * self.width)
+
+    def __getitem__(self, i):
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("Индекс точки вне массива")
+        w = self.width
+        start = 2 * w * i
+        x = int.from_bytes(self._buffer[start:start + w], 'big')
+        if x == self.p:
+            return None
+        return Point(x, int.from_bytes(self._buffer[start + w:start + 2 * w], 'big'))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+def encode_point(curve, P, compressed=True):
+    """
+    Кодирование SEC1 (2.3.3): 0x00 - бесконечность,
+    0x02/0x03 || x - сжатая форма (младший бит y), 0x04 || x || y - несжатая
+    """
+    if P is None:
+        return b'\x00'
+    p = curve.p
+    w = _width(p)
+    x, y = P[0] % p, P[1] % p
+    if compressed:
+        return bytes([2 | (y & 1)]) + x.to_bytes(w, 'big')
+    return b'\x04' + x.to_bytes(w, 'big') + y.to_bytes(w, 'big')
+
+
+def _split(curve, data):
+    """Разбор заголовка SEC1: (префикс, x, y или None)"""
+    p = curve.p
+    w = _width(p)
+    prefix = data[0] if data else None
+    if prefix == 0 and len(data) == 1:
+        return 0, None, None
+    if prefix in (2, 3) and len(data) == 1 + w:
+        x = int.from_bytes(data[1:], 'big')
+        y = None
+    elif prefix == 4 and len(data) == 1 + 2 * w:
+        x = int.from_bytes(data[1:1 + w], 'big')
+        y = int.from_bytes(data[1 + w:], 'big')
+    else:
+        raise ValueError("Неверная кодировка точки SEC1")
+    if x >= p or (y is not None and y >= p):
+        raise ValueError("Координата точки вне поля")
+    return prefix, x, y
+
+
+def _choose_root(roots, parity, x, p):
+    """Корень y с заданной четностью (второй корень - p - y)"""
+    if not roots:
+        raise ValueError(f"Нет точки кривой с x = {x}")
+    y = roots[0]
+    if y & 1 != parity:
+        y = p - y
+        if y == p:
+            raise ValueError(f"Нет точки кривой с x = {x} и нечетной y")
+    return y
+
+
+def decode_point(curve, data):
+    """Декодирование SEC1 с проверкой принадлежности кривой"""
+    return decode_points(curve, [data])[0]
+
+
+def decode_points(curve, blobs):
+    """
+    Декодирование многих точек SEC1. Сжатые точки восстанавливаются одним
+    вызовом get_y_batch (константы извлечения корня вычисляются один раз)
+    """
+    parsed = [_split(curve, data) for data in blobs]
+    compressed = [i for i, (prefix, _, _) in enumerate(parsed) if prefix in (2, 3)]
+    roots = curve.get_y_batch([parsed[i][1] for i in compressed])
+
+    points = [None] * len(parsed)
+    for i, (prefix, x, y) in enumerate(parsed):
+        if prefix == 4:
+            if not curve.is_point_on_curve(x, y):
+                raise ValueError(f"Точка ({x}, {y}) не лежит на кривой")
+            points[i] = Point(x, y)
+    for i, ys in zip(compressed, roots):
+        prefix, x, _ = parsed[i]
+        points[i] = Point(x, _choose_root(ys, prefix & 1, x, curve.p))
+    return points
+
+
+def encode_x_only(curve, P):
+    """Только x-координата (ширина поля): ключ на байт короче сжатого SEC1"""
+    return (P[0] % curve.p).to_bytes(_width(curve.p), 'big')
+
+
+def decode_x(curve, data):
+    """
+    x-координата публичного ключа из x-only (ширина поля), сжатой
+    или несжатой формы SEC1 - без восстановления y
+    """
+    if len(data) == _width(curve.p):
+        x = int.from_bytes(data, 'big')
+        if x >= curve.p:
+            raise ValueError("Координата точки вне поля")
+        return x
+    prefix, x, y = _split(curve, data)
+    if prefix == 0:
+        raise ValueError("Публичный ключ - точка в бесконечности")
+    if y is not None and not curve.is_point_on_curve(x, y):
+        raise ValueError(f"Точка ({x}, {y}) не лежит на кривой")
+    return x
+
+
+def x_only_ecdh(curve, d, public_key, method='lift'):
+    """
+    Общий секрет ECDH - x(d*H) - по ключу собеседника public_key: целое x,
+    точка (x, y) или байты (x-only или SEC1). По умолчанию y восстанавливается
+    одним корнем и используется обычное умножение; method='ladder' - co-Z
+    лестница совсем без y (на CPython выигрывает только при p ≡ 1 (mod 8),
+    например P-224), см. ecc_tool.x_only_multiply
+    """
+    if isinstance(public_key, (bytes, bytearray, memoryview)):
+        x = decode_x(curve, bytes(public_key))
+    elif isinstance(public_key, int):
+        x = public_key
+    else:
+        x = public_key[0]
+    shared = ecc.x_only_multiply(curve, d, x, method)
+    if shared is None:
+        raise ValueError("Общий секрет - точка в бесконечности")
+    return shared
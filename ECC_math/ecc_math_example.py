@@ -1,4 +1,5 @@
 import ecc_tool as ecc
+import ecdlp
 
 
 # Создаем демонстрационные функции для лекции
@@ -17,14 +18,14 @@ def demonstrate_ecc_operations():
     print("   y² ≡ x³ + 2x + 3 (mod 23)")
     curve_f23 = ecc.EllipticCurve(2, 3, 23)
     
-    # Найдем все точки кривой в F₂₃
+    # Найдем все точки кривой в F₂₃ (порядок группы считается без перебора поля)
     points = []
     for x in range(23):
         y_values = curve_f23.get_y(x)
         for y in y_values:
             points.append((x, y))
     
-    print(f"   Кривая содержит {len(points)} точек (плюс точка в бесконечности)")
+    print(f"   Кривая содержит {curve_f23.order() - 1} точек (плюс точка в бесконечности)")
     print(f"   Первые 10 точек: {points[:10]}")
     
     # Пример 3: Сложение точек
@@ -68,6 +69,9 @@ def demonstrate_ecdh():
             break
     
     print(f"Выбранная базовая точка G = {G}")
+
+    # G фиксирована для кривой - строим таблицу кратных один раз
+    curve.precompute_base_point(G)
     
     # Алиса и Боб генерируют приватные ключи
     import random
@@ -89,14 +93,20 @@ def demonstrate_ecdh():
     print("\n Алиса и Боб обмениваются публичными ключами по открытому каналу")
     
     # Вычисляют общий секрет
-    alice_secret = ecc.point_multiply(curve, alice_private, bob_public)
-    bob_secret = ecc.point_multiply(curve, bob_private, alice_public)
+    with curve.count_operations() as ops:
+        alice_secret = ecc.point_multiply(curve, alice_private, bob_public)
+        bob_secret = ecc.point_multiply(curve, bob_private, alice_public)
     
     print(f"\nАлиса вычисляет: S = dₐ×Hᵦ = {alice_private}×{bob_public} = {alice_secret}")
     print(f"Боб вычисляет: S = dᵦ×Hₐ = {bob_private}×{alice_public} = {bob_secret}")
 
     print("\nАлиса и Боб получили одинаковый общий секрет")
     print(f"   Общий секрет: S = {alice_secret}")
+    print(f"   Стоимость вычисления секретов: {ops}")
+
+    # Для общего секрета достаточно x-координат: y собеседника не нужна
+    shared_x = ecc.x_only_multiply(curve, alice_private, bob_public[0])
+    print(f"   x-only: по одной x(Hᵦ) = {bob_public[0]} получаем x(S) = {shared_x}")
 
     print(f"\n Математическое обоснование:")
     print(f"   S = dₐ×(dᵦ×G) = dₐ×dᵦ×G = {alice_private}×{bob_private}×G")
@@ -127,9 +137,10 @@ def demonstrate_discrete_log_problem():
     
     print(f"\n Решение методом полного перебора:")
     
-    # Перебираем все возможные значения k
+    # Перебираем все возможные значения k: test_P = test_k×G получаем одним сложением
+    test_P = None
     for test_k in range(1, 24):
-        test_P = ecc.point_multiply(curve, test_k, G)
+        test_P = ecc.point_add(curve, test_P, G)
         if test_P == P:
             print(f"   Найдено: k = {test_k}")
             print(f"   Проверка: {test_k}×{G} = {test_P}")
@@ -137,6 +148,14 @@ def demonstrate_discrete_log_problem():
         else:
             print(f"   k = {test_k}: {test_k}×G = {test_P} ≠ P")
     
+    print(f"\n Шаги младенца/великана: k = {ecdlp.bsgs(curve, G, P)} за O(√n) операций")
+    print(f"   ρ-метод Полларда: k = {ecdlp.pollard_rho(curve, G, P, seed=1)} за O(√n) операций и O(1) памяти")
+
+    order = ecc.point_order(curve, G)
+    factors = " × ".join(f"{q}^{e}" if e > 1 else f"{q}" for q, e in ecc.factorize(order).items())
+    print(f"   Полиг-Хеллман: порядок G = {order} = {factors}, k = {ecdlp.pohlig_hellman(curve, G, P, order)}")
+    print(f"   (стоимость определяется наибольшим простым делителем порядка)")
+
     print(f"\n Для малого поля (p = 23) задача решается за {23} операций")
     print(f"   Для Bitcoin (p ≈ 2²⁵⁶) потребовалось бы ~2²⁵⁶ операций!")
     print(f"   Это примерно 10⁷⁷ операций")
@@ -0,0 +1,503 @@
+import math
+import random
+
+import ecc_tool as ecc
+
+
+# До этого p порядок считается прямым суммированием символов Лежандра
+DIRECT_COUNT_LIMIT = 10000
+
+# Максимальное число кандидатов на след Фробениуса, которое проверяет BSGS;
+# при большем интервале след сначала сужается алгоритмом Шуфа
+BSGS_MAX_WIDTH = 2**32
+
+
+def curve_order(curve, rng=None):
+    """
+    Число точек #E(F_p) (включая точку в бесконечности) без перебора поля:
+    - малые p: сумма символов Лежандра, O(p);
+    - средние p: шаги младенца/великана Местре в интервале Хассе, O(p^(1/4));
+    - большие p: алгоритм Шуфа (t mod l для малых простых l) + BSGS по остатку.
+    """
+    p = curve.p
+    if not p:
+        raise ValueError("Порядок группы определен только для кривой над конечным полем")
+    if (4 * curve.a**3 + 27 * curve.b**2) % p == 0:
+        raise ValueError("Кривая особая: 4a³ + 27b² ≡ 0 (mod p)")
+
+    if p < DIRECT_COUNT_LIMIT:
+        return count_points(curve)
+
+    rng = rng or random.Random(p)
+    bound = math.isqrt(4 * p)  # |t| <= 2*sqrt(p)
+    t0, modulus = 0, 1
+    if 2 * bound // modulus + 1 > BSGS_MAX_WIDTH:
+        t0, modulus = schoof_trace_residue(curve, 2 * bound // BSGS_MAX_WIDTH + 1)
+    return p + 1 - _trace_by_bsgs(curve, t0, modulus, bound, rng)
+
+
+def count_points(curve):
+    """#E(F_p) = p + 1 + Σ ((x³ + ax + b) / p) - прямой подсчет за O(p), p нечетно"""
+    p = curve.p
+    return p + 1 + sum(ecc.legendre_symbol(x**3 + curve.a * x + curve.b, p) for x in range(p))
+
+
+def quadratic_twist(curve):
+    """Квадратичное кручение y² = x³ + a·g²·x + b·g³ (g - невычет), #E' = 2p + 2 - #E"""
+    p = curve.p
+    g = 2
+    while ecc.legendre_symbol(g, p) != -1:
+        g += 1
+    return ecc.EllipticCurve(curve.a * g * g % p, curve.b * g**3 % p, p)
+
+
+def random_point(curve, rng):
+    """Случайная аффинная точка кривой над F_p"""
+    while True:
+        x = rng.randrange(curve.p)
+        ys = curve.get_y(x)
+        if ys:
+            return (x, rng.choice(ys))
+
+
+def _trace_by_bsgs(curve, t0, modulus, bound, rng, limit=64, attempts=64):
+    """
+    Находит след t ≡ t0 (mod modulus), |t| <= bound, по случайным точкам E и кручения E'
+    (метод Местре): для E ищем n = p + 1 - t с nP = O, для E' - n' = p + 1 + t с n'P' = O.
+    Кандидаты пересекаются, пока не останется единственный.
+    """
+    p = curve.p
+    twist = quadratic_twist(curve)
+    j_lo = -((bound + t0) // modulus)
+    j_hi = (bound - t0) // modulus
+
+    candidates = None
+    for _ in range(attempts):
+        for E, sign in ((curve, -1), (twist, 1)):
+            P = random_point(E, rng)
+            # n = (p + 1 + sign*t0) + sign*modulus*j
+            solutions = _bsgs_solutions(E, P, p + 1 + sign * t0, sign * modulus, j_lo, j_hi, limit)
+            if solutions is None:
+                continue
+            candidates = solutions if candidates is None else candidates & solutions
+            if len(candidates) == 1:
+                return t0 + modulus * candidates.pop()
+            if not candidates:
+                raise ValueError("Не удалось определить порядок: p не простое или кривая некорректна")
+    raise ValueError("Не удалось однозначно определить порядок группы")
+
+
+def _bsgs_solutions(curve, P, c0, c1, j_lo, j_hi, limit):
+    """
+    Все j из [j_lo, j_hi] с (c0 + c1*j)·P = O методом шагов младенца/великана.
+    Возвращает None, если решений больше limit.
+    """
+    target = ecc.point_negate(curve, ecc.point_multiply(curve, c0, P))
+    B = ecc.point_multiply(curve, c1, P)
+    width = j_hi - j_lo + 1
+    m = math.isqrt(width) + 1
+
+    # Шаги младенца: t·B для t < m; повтор означает, что порядок B меньше m
+    baby = {}
+    R = None
+    period = None
+    for t in range(m):
+        if R in baby:
+            period = t
+            break
+        baby[R] = t
+        R = ecc.point_add(curve, R, B)
+
+    # Ищем (j_lo + t)·B = target
+    C = ecc.point_add(curve, target, ecc.point_negate(curve, ecc.point_multiply(curve, j_lo, B)))
+
+    if period is not None:
+        if C not in baby:
+            return set()
+        first = j_lo + baby[C]
+        if (j_hi - first) // period + 1 > limit:
+            return None
+        return set(range(first, j_hi + 1, period))
+
+    step = ecc.point_negate(curve, ecc.point_multiply(curve, m, B))
+    solutions = set()
+    for i in range(width // m + 1):
+        if C in baby:
+            j = j_lo + i * m + baby[C]
+            if j <= j_hi:
+                solutions.add(j)
+                if len(solutions) > limit:
+                    return None
+        C = ecc.point_add(curve, C, step)
+    return solutions
+
+
+# ---------------------------------------------------------------------------
+# Алгоритм Шуфа
+# ---------------------------------------------------------------------------
+
+class _FactorFound(Exception):
+    """Найден нетривиальный делитель модуля кольца F_p[x]/(h)"""
+
+    def __init__(self, factor):
+        super().__init__()
+        self.factor = factor
+
+
+def _trim(f):
+    while f and f[-1] == 0:
+        f.pop()
+    return f
+
+
+def _poly_add(f, g, p):
+    if len(f) < len(g):
+        f, g = g, f
+    result = list(f)
+    for i, c in enumerate(g):
+        result[i] = (result[i] + c) % p
+    return _trim(result)
+
+
+def _poly_sub(f, g, p):
+    return _poly_add(f, [(-c) % p for c in g], p)
+
+
+def _poly_scale(f, c, p):
+    return _trim([a * c % p for a in f])
+
+
+def _poly_mul(f, g, p):
+    """Умножение многочленов подстановкой Кронекера (одно умножение длинных чисел)"""
+    if not f or not g:
+        return []
+    n = min(len(f), len(g))
+    if n <= 8:
+        result = [0] * (len(f) + len(g) - 1)
+        for i, a in enumerate(f):
+            if a:
+                for j, b in enumerate(g):
+                    result[i + j] += a * b
+        return _trim([c % p for c in result])
+
+    size = (2 * p.bit_length() + n.bit_length()) // 8 + 1
+    F = int.from_bytes(b''.join(c.to_bytes(size, 'little') for c in f), 'little')
+    G = int.from_bytes(b''.join(c.to_bytes(size, 'little') for c in g), 'little')
+    length = len(f) + len(g) - 1
+    data = (F * G).to_bytes(length * size + size, 'little')
+    return _trim([int.from_bytes(data[i * size:(i + 1) * size], 'little') % p
+                  for i in range(length)])
+
+
+def _poly_divmod(f, g, p):
+    """Деление многочленов с остатком (в столбик)"""
+    f = list(f)
+    inv = pow(g[-1], -1, p)
+    quotient = [0] * max(len(f) - len(g) + 1, 0)
+    for i in range(len(f) - len(g), -1, -1):
+        c = f[i + len(g) - 1] * inv % p
+        quotient[i] = c
+        if c:
+            for j, b in enumerate(g):
+                f[i + j] = (f[i + j] - c * b) % p
+    return _trim(quotient), _trim(f[:len(g) - 1])
+
+
+def _poly_gcd(f, g, p):
+    """Нормированный НОД многочленов"""
+    while g:
+        f, g = g, _poly_divmod(f, g, p)[1]
+    return _poly_scale(f, pow(f[-1], -1, p), p) if f else f
+
+
+def _poly_inverse_series(f, n, p):
+    """1/f mod x^n итерацией Ньютона (f[0] != 0)"""
+    g = [pow(f[0], -1, p)]
+    precision = 1
+    while precision < n:
+        precision = min(2 * precision, n)
+        e = [(-c) % p for c in _poly_mul(f[:precision], g, p)[:precision]]
+        e += [0] * (1 - len(e))
+        e[0] = (e[0] + 2) % p
+        g = _trim(_poly_mul(g, e, p)[:precision])
+    return g
+
+
+class _QuotientRing:
+    """Кольцо F_p[x]/(h), приведение по модулю h двумя умножениями (аналог Барретта)"""
+
+    def __init__(self, h, p):
+        self.p = p
+        self.h = _poly_scale(h, pow(h[-1], -1, p), p)
+        self.d = len(self.h) - 1
+        reversed_h = self.h[::-1]
+        self._inv = _poly_inverse_series(reversed_h, max(self.d, 1), p)
+
+    def reduce(self, f):
+        d = self.d
+        if len(f) <= d:
+            return f
+        k = len(f) - 1 - d
+        if k >= d:
+            return _poly_divmod(f, self.h, self.p)[1]
+        q = _poly_mul(f[::-1][:k + 1], self._inv[:k + 1], self.p)[:k + 1]
+        q = (q + [0] * (k + 1 - len(q)))[::-1]
+        return _trim(_poly_sub(f, _poly_mul(q, self.h, self.p), self.p)[:d])
+
+    def const(self, c):
+        return self.reduce(_trim([c % self.p]))
+
+    def add(self, f, g):
+        return _poly_add(f, g, self.p)
+
+    def sub(self, f, g):
+        return _poly_sub(f, g, self.p)
+
+    def scale(self, f, c):
+        return _poly_scale(f, c, self.p)
+
+    def mul(self, f, g):
+        return self.reduce(_poly_mul(f, g, self.p))
+
+    def pow(self, f, e):
+        result = [1]
+        base = self.reduce(f)
+        shift = base == [0, 1]
+        for bit in bin(e)[2:]:
+            result = self.mul(result, result)
+            if bit == '1':
+                # Умножение на x - это сдвиг коэффициентов
+                result = self.reduce([0] + result) if shift else self.mul(result, base)
+        return result
+
+    def composer(self, X):
+        """
+        Подстановка g -> g(X) mod h по Бренту-Кунгу: O(sqrt(d)) умножений в кольце
+        и O(d²) умножений чисел вместо возведения в степень
+        """
+        p = self.p
+        step = math.isqrt(self.d) + 1
+        powers = [[1]]
+        for _ in range(step):
+            powers.append(self.mul(powers[-1], X))
+        giant = powers.pop()
+
+        def compose(g):
+            result = []
+            for start in range((len(g) - 1) // step * step, -1, -step):
+                block = [0] * self.d
+                for c, power in zip(g[start:start + step], powers):
+                    if c:
+                        for i, a in enumerate(power):
+                            block[i] += c * a
+                result = self.add(self.mul(result, giant), _trim([c % p for c in block]))
+            return result
+
+        return compose
+
+    def gcd(self, f):
+        return _poly_gcd(self.h, self.reduce(f), self.p)
+
+
+def division_polynomial(curve, n, _cache=None):
+    """
+    Многочлен деления F_n(x): ψ_n = F_n для нечетных n и ψ_n = y·F_n для четных
+    (корни ψ_n - x-координаты n-кручения)
+    """
+    p, a, b = curve.p, curve.a % curve.p, curve.b % curve.p
+    cache = {} if _cache is None else _cache
+    if n in cache:
+        return cache[n]
+
+    if n <= 4:
+        base = {
+            0: [],
+            1: [1],
+            2: [2],
+            3: [(-a * a) % p, 12 * b % p, 6 * a % p, 0, 3],
+            4: _poly_scale([(-8 * b * b - a**3) % p, (-4 * a * b) % p, (-5 * a * a) % p,
+                            20 * b % p, 5 * a % p, 0, 1], 4, p),
+        }
+        cache[n] = _trim(base[n])
+        return cache[n]
+
+    def F(k):
+        return division_polynomial(curve, k, cache)
+
+    f = [b, a, 0, 1]
+    f2 = _poly_mul(f, f, p)
+    m = n // 2
+    if n % 2:
+        left = _poly_mul(F(m + 2), _poly_mul(F(m), _poly_mul(F(m), F(m), p), p), p)
+        right = _poly_mul(F(m - 1), _poly_mul(F(m + 1), _poly_mul(F(m + 1), F(m + 1), p), p), p)
+        if m % 2 == 0:
+            left = _poly_mul(left, f2, p)
+        else:
+            right = _poly_mul(right, f2, p)
+        result = _poly_sub(left, right, p)
+    else:
+        inner = _poly_sub(_poly_mul(F(m + 2), _poly_mul(F(m - 1), F(m - 1), p), p),
+                          _poly_mul(F(m - 2), _poly_mul(F(m + 1), F(m + 1), p), p), p)
+        result = _poly_scale(_poly_mul(F(m), inner, p), pow(2, -1, p), p)
+    cache[n] = result
+    return result
+
+
+def _ring_double(R, a_f, P):
+    """Удвоение в якобиевых координатах над кольцом R"""
+    X, Y, Z = P
+    XX = R.mul(X, X)
+    YY = R.mul(Y, Y)
+    ZZ = R.mul(Z, Z)
+    S = R.scale(R.mul(X, YY), 4)
+    M = R.add(R.scale(XX, 3), R.mul(a_f, R.mul(ZZ, ZZ)))
+    X3 = R.sub(R.mul(M, M), R.scale(S, 2))
+    Y3 = R.sub(R.mul(M, R.sub(S, X3)), R.scale(R.mul(YY, YY), 8))
+    return (X3, Y3, R.scale(R.mul(Y, Z), 2))
+
+
+def _ring_add(R, P, Q):
+    """Сложение точек с различными x в якобиевых координатах над кольцом R"""
+    X1, Y1, Z1 = P
+    X2, Y2, Z2 = Q
+    Z1Z1 = R.mul(Z1, Z1)
+    Z2Z2 = R.mul(Z2, Z2)
+    U1 = R.mul(X1, Z2Z2)
+    S1 = R.mul(Y1, R.mul(Z2, Z2Z2))
+    H = R.sub(R.mul(X2, Z1Z1), U1)
+    r = R.sub(R.mul(Y2, R.mul(Z1, Z1Z1)), S1)
+    HH = R.mul(H, H)
+    HHH = R.mul(H, HH)
+    V = R.mul(U1, HH)
+    X3 = R.sub(R.sub(R.mul(r, r), HHH), R.scale(V, 2))
+    Y3 = R.sub(R.mul(r, R.sub(V, X3)), R.mul(S1, HHH))
+    return (X3, Y3, R.mul(R.mul(Z1, Z2), H))
+
+
+def _ring_multiple(R, a_f, P, k, l):
+    """[k]P для ненулевой точки l-кручения P (k mod l ≠ 0)"""
+    k %= l
+    negate = k > l // 2
+    if negate:
+        k = l - k
+    result = P
+    for bit in bin(k)[3:]:
+        result = _ring_double(R, a_f, result)
+        if bit == '1':
+            result = _ring_add(R, result, P)
+    if negate:
+        result = (result[0], R.sub([], result[1]), result[2])
+    return result
+
+
+def _x_difference(R, P, Q):
+    """Числитель x(P) - x(Q) для якобиевых точек (нулевой, если x совпадают)"""
+    return R.sub(R.mul(P[0], R.mul(Q[2], Q[2])), R.mul(Q[0], R.mul(P[2], P[2])))
+
+
+def _y_difference(R, P, Q):
+    """Числитель y(P) - y(Q) для якобиевых точек"""
+    return R.sub(R.mul(P[1], R.mul(Q[2], R.mul(Q[2], Q[2]))),
+                 R.mul(Q[1], R.mul(P[2], R.mul(P[2], P[2]))))
+
+
+def _split_or_keep(R, g):
+    """Если g - собственный делитель модуля, продолжаем с меньшим из множителей"""
+    h = R.h
+    if 0 < len(g) - 1 < R.d:
+        other = _poly_divmod(h, g, R.p)[0]
+        raise _FactorFound(g if len(g) <= len(other) else other)
+
+
+def _trace_mod_2(curve):
+    """t ≡ 0 (mod 2) тогда и только тогда, когда есть точка порядка 2 (НОД(x^p - x, f) ≠ 1)"""
+    p = curve.p
+    R = _QuotientRing([curve.b % p, curve.a % p, 0, 1], p)
+    g = R.gcd(R.sub(R.pow([0, 1], p), [0, 1]))
+    return 0 if len(g) > 1 else 1
+
+
+def _trace_mod_l(curve, l, h):
+    """
+    t mod l по модулю h | ψ_l. Точки l-кручения (x, y) переводятся на изоморфную
+    кривую v² = u³ + a·f²·u + b·f³ над F_p[x]/(h): (u, v) = (f·x, f²·y/y),
+    где f = x³ + ax + b, так что все координаты - многочлены от x.
+    """
+    p = curve.p
+    R = _QuotientRing(h, p)
+    f = R.reduce([curve.b % p, curve.a % p, 0, 1])
+    f2 = R.mul(f, f)
+    a_f = R.scale(f2, curve.a % p)
+    one = [1]
+
+    # Фробениус: π(x, y) = (x^p, y·f^((p-1)/2)), π² - то же еще раз
+    X1 = R.pow([0, 1], p)
+    Y1 = R.pow(f, (p - 1) // 2)
+    # g(x)^p = g(x^p) в F_p[x], поэтому π² получается подстановкой X1
+    frobenius = R.composer(X1)
+    X2 = frobenius(X1)
+    Y2 = R.mul(frobenius(Y1), Y1)
+
+    P = (R.mul(f, [0, 1]), f2, one)
+    piP = (R.mul(f, X1), R.mul(f2, Y1), one)
+    pi2P = (R.mul(f, X2), R.mul(f2, Y2), one)
+
+    q = p % l
+    qP = _ring_multiple(R, a_f, P, q, l)
+
+    g = R.gcd(_x_difference(R, pi2P, qP))
+    _split_or_keep(R, g)
+    if len(g) == 1:
+        # Общий случай: π²P + qP = t·πP, ищем t = ±τ
+        S = _ring_add(R, pi2P, qP)
+        T = piP
+        for tau in range(1, (l - 1) // 2 + 1):
+            if tau == 2:
+                T = _ring_double(R, a_f, piP)
+            elif tau > 2:
+                T = _ring_add(R, T, piP)
+            if _x_difference(R, S, T):
+                continue
+            return tau if not _y_difference(R, S, T) else l - tau
+        raise ValueError("Шуф: след не найден - p не простое или кривая некорректна")
+
+    # Особый случай: π²P = ±qP для всех точек
+    g = R.gcd(_y_difference(R, pi2P, qP))
+    _split_or_keep(R, g)
+    if len(g) == 1:
+        return 0  # π²P = -qP, значит t·πP = O
+    # π²P = qP: t ≡ ±2w, где w² ≡ q (mod l), либо t ≡ 0
+    w = next((w for w in range(1, l) if w * w % l == q), None)
+    if w is None:
+        return 0
+    wP = _ring_multiple(R, a_f, P, w, l)
+    g = R.gcd(_x_difference(R, piP, wP))
+    if len(g) == 1:
+        return 0
+    _split_or_keep(R, g)
+    g = R.gcd(_y_difference(R, piP, wP))
+    _split_or_keep(R, g)
+    return 2 * w % l if len(g) > 1 else (-2 * w) % l
+
+
+def schoof_trace_residue(curve, target):
+    """Остаток следа Фробениуса t0 = t mod M, где M - произведение малых простых, M >= target"""
+    p = curve.p
+    t0, modulus = _trace_mod_2(curve), 2
+    cache = {}
+    l = 3
+    while modulus < target:
+        if l != p and all(l % d for d in range(3, math.isqrt(l) + 1, 2)):
+            h = division_polynomial(curve, l, cache)
+            while True:
+                try:
+                    residue = _trace_mod_l(curve, l, h)
+                    break
+                except _FactorFound as e:
+                    h = e.factor
+            # Китайская теорема об остатках
+            k = (residue - t0) * pow(modulus, -1, l) % l
+            t0 += modulus * k
+            modulus *= l
+        l += 2
+    return t0, modulus
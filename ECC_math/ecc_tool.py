@@ -1,4 +1,10 @@
+import collections
+import contextlib
+import functools
 import math
+import mmap
+import struct
+import sys
 
 
 class EllipticCurve:
@@ -16,6 +22,92 @@ class EllipticCurve:
         if p:
             discriminant = discriminant % p
 
+        # Таблица предвычислений для фиксированной базовой точки (см. FixedBaseTable)
+        self.base_table = None
+
+        # Метод умножения на скаляр для произвольной точки: 'wnaf' или 'binary'
+        self.scalar_method = 'wnaf'
+        self.wnaf_width = 4
+
+        # Порядок группы точек, вычисляется лениво в order()
+        self._order = None
+
+        # Специальная арифметика для простых вида 2^k - c (см. SpecialPrimeField)
+        self.field = None
+
+        # Эндоморфизм GLV для кривых с a = 0 (см. setup_glv)
+        self.glv = None
+
+        # Счетчик операций (см. count_operations); None - подсчет выключен
+        self.counter = None
+
+        # Кэш таблиц предвычислений для часто повторяющихся точек (см. enable_table_cache)
+        self.table_cache = None
+
+    def precompute_base_point(self, G, window=4, order=None):
+        """Строит таблицу кратных базовой точки G, после чего k*G считается только сложениями"""
+        self.base_table = FixedBaseTable.build(self, G, window, order)
+        return self.base_table
+
+    def load_base_point_table(self, path, order=None):
+        """Подключает ранее сохраненную таблицу базовой точки (файл отображается в память)"""
+        self.base_table = FixedBaseTable.load(self, path, order)
+        return self.base_table
+
+    def order(self):
+        """
+        Порядок группы E(F_p) (число точек вместе с точкой в бесконечности).
+        Без перебора поля: BSGS Местре для средних p, алгоритм Шуфа для больших
+        """
+        if self._order is None:
+            # Импорт здесь: ecc_order сам использует арифметику этого модуля
+            from ecc_order import curve_order
+            self._order = curve_order(self)
+        return self._order
+
+    def setup_glv(self):
+        """
+        Подключает эндоморфизм GLV, если кривая это допускает: a = 0, p ≡ 1 (mod 3)
+        и порядок группы - простое n ≡ 1 (mod 3). Тогда point_multiply для
+        произвольной точки работает со скалярами половинной длины.
+        Возвращает эндоморфизм или None
+        """
+        self.glv = None
+        if not self.p or self.a % self.p or self.p % 3 != 1:
+            return None
+        n = self.order()
+        if n % 3 != 1 or not is_probable_prime(n):
+            return None
+        self.glv = GLVEndomorphism(self, n)
+        return self.glv
+
+    def enable_table_cache(self, memory_limit=16 * 2**20, promote_after=8, window=4):
+        """
+        Включает LRU-кэш таблиц предвычислений для произвольных точек
+        (например, повторяющихся публичных ключей собеседников), см. TableCache
+        """
+        self.table_cache = TableCache(self, memory_limit, promote_after, window)
+        return self.table_cache
+
+    @contextlib.contextmanager
+    def count_operations(self):
+        """
+        Подсчет операций внутри блока with:
+            with curve.count_operations() as ops:
+                point_multiply(curve, k, P)
+            print(ops)
+        Вне блока подсчет выключен и стоит одну проверку атрибута на групповую операцию.
+        Вложенные блоки добавляют свои счетчики к внешнему
+        """
+        counter = OperationCounter()
+        previous, self.counter = self.counter, counter
+        try:
+            yield counter
+        finally:
+            self.counter = previous
+            if previous is not None:
+                previous.merge(counter)
+
     def is_point_on_curve(self, x, y):
         if self.p:
             return (y**2) % self.p == (x**3 + self.a * x + self.b) % self.p
@@ -38,28 +130,228 @@ class EllipticCurve:
             else:
                 return []
 
+    def get_y_batch(self, xs):
+        """
+        get_y для многих x сразу: константы извлечения корня для p
+        (разложение p - 1 = q*2^s и невычет) вычисляются один раз
+        """
+        if not self.p:
+            return [self.get_y(x) for x in xs]
+        p = self.p
+        constants = _sqrt_constants(p)
+        return [_sqrt_mod_prime((x**3 + self.a * x + self.b) % p, p, constants) for x in xs]
+
     def sqrt_mod(self, a, p):
         """Находит квадратные корни в конечном поле"""
-        if a == 0:
-            return [0]
+        return _sqrt_mod_prime(a % p, p, _sqrt_constants(p))
+
+class OperationCounter:
+    """
+    Счетчики операций: групповые (удвоения, сложения, вызовы point_multiply)
+    и полевые (умножения M, возведения в квадрат S, инверсии I).
+    Полевые операции учитываются по формулам соответствующих групповых операций;
+    умножения на малые константы не считаются
+    """
+
+    FIELDS = ('double', 'add', 'scalar_mul', 'mul', 'sqr', 'inv')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        for name in self.FIELDS:
+            setattr(self, name, 0)
+
+    def record(self, op, mul=0, sqr=0, inv=0, count=1):
+        """count операций op ('double', 'add' или None), каждая стоимостью mul M + sqr S + inv I"""
+        if op is not None:
+            setattr(self, op, getattr(self, op) + count)
+        self.mul += mul * count
+        self.sqr += sqr * count
+        self.inv += inv * count
+
+    def merge(self, other):
+        for name in self.FIELDS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def __str__(self):
+        return (f"{self.double} удв., {self.add} слож., {self.scalar_mul} умн. на скаляр; "
+                f"поле: {self.mul}M + {self.sqr}S + {self.inv}I")
+
+    def __repr__(self):
+        return f"OperationCounter({self.as_dict()})"
 
-        # Простейший случай - используем алгоритм Тонелли-Шанкса
-        # Для простоты используем только случай p ≡ 3 (mod 4)
-        if p % 4 == 3:
-            r = pow(a, (p + 1) // 4, p)
-            if (r * r) % p == a % p:
-                return [r, p - r] if r != p - r else [r]
 
-        # Полный перебор для малых p
+# Стоимость групповых операций в умножениях (M) и квадратах (S) поля
+_COST_AFFINE_ADD = (2, 1, 1)       # + 1 инверсия
+_COST_AFFINE_DOUBLE = (2, 2, 1)
+_COST_DOUBLE = (3, 4)              # a = 0
+_COST_DOUBLE_A = (4, 6)
+_COST_ADD = (12, 4)
+_COST_ADD_MIXED = (8, 3)
+_COST_TO_AFFINE = (3, 1, 1)
+
+def legendre_symbol(a, p):
+    """Символ Лежандра (a/p) для нечетного простого p через закон взаимности, без возведения в степень"""
+    a %= p
+    result = 1
+    while a:
+        while a % 2 == 0:
+            a //= 2
+            if p % 8 in (3, 5):
+                result = -result
+        a, p = p, a
+        if a % 4 == 3 and p % 4 == 3:
+            result = -result
+        a %= p
+    return result if p == 1 else 0
+
+def is_probable_prime(n):
+    """Тест Миллера-Рабина (детерминированный для n < 3.3 * 10^24)"""
+    if n < 2:
+        return False
+    small = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+    for q in small:
+        if n % q == 0:
+            return n == q
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for a in small:
+        x = pow(a, d, n)
+        if x in (1, n - 1):
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+def _pollard_brent(n):
+    """Нетривиальный делитель составного n (ρ-метод Полларда в варианте Брента)"""
+    if n % 2 == 0:
+        return 2
+    c = 1
+    while True:
+        y, r, q, g = 2, 1, 1, 1
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(128, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = math.gcd(q, n)
+                k += 128
+            r *= 2
+        if g == n:
+            # Произведение обнулилось - повторяем по одному шагу
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % n
+                g = math.gcd(abs(x - ys), n)
+        if g != n:
+            return g
+        c += 1
+
+def factorize(n):
+    """Разложение n на простые множители: {простое: степень}"""
+    factors = {}
+    for q in (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47):
+        while n % q == 0:
+            factors[q] = factors.get(q, 0) + 1
+            n //= q
+    stack = [n] if n > 1 else []
+    while stack:
+        m = stack.pop()
+        if is_probable_prime(m):
+            factors[m] = factors.get(m, 0) + 1
+            continue
+        d = _pollard_brent(m)
+        stack.extend((d, m // d))
+    return dict(sorted(factors.items()))
+
+@functools.lru_cache(maxsize=None)
+def _sqrt_constants(p):
+    """
+    Константы извлечения корня по модулю p, зависящие только от p:
+    p - 1 = q * 2^s (q нечетно), z - квадратичный невычет, c = z^q.
+    Для составного p < 1000 - None (корни ищутся перебором), для большего - ValueError
+    """
+    if not is_probable_prime(p):
         if p < 1000:
-            roots = []
-            for i in range(p):
-                if (i * i) % p == a % p:
-                    roots.append(i)
-            return roots
+            return None
+        raise ValueError(f"Модуль {p} составной: корни ищутся только по простому модулю")
+    q, s = p - 1, 0
+    while q % 2 == 0:
+        q //= 2
+        s += 1
+    if p % 8 != 1:
+        # Для p ≡ 3 (mod 4) и p ≡ 5 (mod 8) есть явные формулы
+        return q, s, None
+    z = 2
+    while legendre_symbol(z, p) != -1:
+        z += 1
+    return q, s, pow(z, q, p)
 
+def _sqrt_mod_prime(a, p, constants):
+    """Квадратные корни из a (0 <= a < p) по простому модулю p"""
+    if constants is None:
+        # Малый составной модуль: полный перебор, как раньше
+        return [i for i in range(p) if i * i % p == a]
+    if a == 0:
+        return [0]
+    if p == 2:
+        return [a]
+    if p % 4 == 3:
+        # Одно возведение в степень; для невычета r^2 ≠ a, символ Лежандра не нужен
+        r = pow(a, (p + 1) // 4, p)
+        return [r, p - r] if r * r % p == a else []
+
+    # Быстрая проверка: невычет не имеет корней
+    if legendre_symbol(a, p) != 1:
         return []
 
+    if p % 8 == 5:
+        # Метод Аткина: одно возведение в степень
+        b = pow(2 * a, (p - 5) // 8, p)
+        i = 2 * a * b * b % p
+        r = a * b * (i - 1) % p
+    else:
+        # Алгоритм Тонелли-Шанкса
+        q, s, c = constants
+        m = s
+        t = pow(a, q, p)
+        r = pow(a, (q + 1) // 2, p)
+        while t != 1:
+            # Наименьшее i, при котором t^(2^i) = 1
+            i, t2 = 0, t
+            while t2 != 1:
+                t2 = t2 * t2 % p
+                i += 1
+                if i == m:
+                    raise ValueError(f"Модуль {p} не простой")
+            b = pow(c, 1 << (m - i - 1), p)
+            m = i
+            c = b * b % p
+            t = t * c % p
+            r = r * b % p
+
+    # Для p ≢ 3 (mod 4) корни по возрастанию, как в прежнем переборе
+    return sorted((r, p - r))
+
+# Точка в бесконечности в якобиевых координатах (Z = 0)
+_JACOBIAN_INFINITY = (1, 1, 0)
+
 def point_add(curve, P, Q):
     """Сложение точек на эллиптической кривой"""
     # Случай с точкой в бесконечности
@@ -78,11 +370,15 @@ def point_add(curve, P, Q):
                 # Удвоение точки
                 if y1 == 0:
                     return None  # Результат - точка в бесконечности
+                if curve.counter is not None:
+                    curve.counter.record('double', *_COST_AFFINE_DOUBLE)
                 s = (3 * x1**2 + curve.a) * pow(2 * y1, -1, curve.p) % curve.p
             else:
                 return None  # Результат - точка в бесконечности
         else:
             # Обычное сложение
+            if curve.counter is not None:
+                curve.counter.record('add', *_COST_AFFINE_ADD)
             s = (y2 - y1) * pow(x2 - x1, -1, curve.p) % curve.p
 
         x3 = (s**2 - x1 - x2) % curve.p
@@ -94,11 +390,15 @@ def point_add(curve, P, Q):
                 # Удвоение точки
                 if y1 == 0:
                     return None  # Результат - точка в бесконечности
+                if curve.counter is not None:
+                    curve.counter.record('double', *_COST_AFFINE_DOUBLE)
                 s = (3 * x1**2 + curve.a) / (2 * y1)
             else:
                 return None  # Результат - точка в бесконечности
         else:
             # Обычное сложение
+            if curve.counter is not None:
+                curve.counter.record('add', *_COST_AFFINE_ADD)
             s = (y2 - y1) / (x2 - x1)
 
         x3 = s**2 - x1 - x2
@@ -106,14 +406,495 @@ def point_add(curve, P, Q):
 
     return (x3, y3)
 
-def point_multiply(curve, k, P):
-    """Умножение точки на скаляр (k*P)"""
+def _to_jacobian(curve, P):
+    """Перевод аффинной точки в якобиевы координаты (X, Y, Z)"""
+    if P is None:
+        return _JACOBIAN_INFINITY
+    return (P[0] % curve.p, P[1] % curve.p, 1)
+
+def _from_jacobian(curve, P):
+    """Перевод из якобиевых координат в аффинные: x = X/Z², y = Y/Z³"""
+    X, Y, Z = P
+    if Z == 0:
+        return None
+    if curve.counter is not None:
+        curve.counter.record(None, *_COST_TO_AFFINE)
+    p = curve.p
+    z_inv = pow(Z, -1, p)
+    z_inv2 = z_inv * z_inv % p
+    return (X * z_inv2 % p, Y * z_inv2 * z_inv % p)
+
+def _jacobian_double(curve, P):
+    """Удвоение точки в якобиевых координатах (без инверсий)"""
+    if curve.counter is not None and P[2]:
+        curve.counter.record('double', *(_COST_DOUBLE_A if curve.a else _COST_DOUBLE))
+    if curve.field is not None:
+        return curve.field.double(curve.a, P)
+    X1, Y1, Z1 = P
+    if Z1 == 0 or Y1 == 0:
+        return _JACOBIAN_INFINITY
+    p = curve.p
+    XX = X1 * X1 % p
+    YY = Y1 * Y1 % p
+    YYYY = YY * YY % p
+    S = 4 * X1 * YY % p
+    if curve.a:
+        ZZ = Z1 * Z1 % p
+        M = (3 * XX + curve.a * ZZ * ZZ) % p
+    else:
+        M = 3 * XX % p
+    X3 = (M * M - 2 * S) % p
+    Y3 = (M * (S - X3) - 8 * YYYY) % p
+    Z3 = 2 * Y1 * Z1 % p
+    return (X3, Y3, Z3)
+
+def _jacobian_add(curve, P, Q):
+    """Сложение двух точек в якобиевых координатах (без инверсий)"""
+    if curve.counter is not None and P[2] and Q[2]:
+        curve.counter.record('add', *_COST_ADD)
+    if curve.field is not None:
+        return curve.field.add(curve.a, P, Q)
+    X1, Y1, Z1 = P
+    X2, Y2, Z2 = Q
+    if Z1 == 0:
+        return Q
+    if Z2 == 0:
+        return P
+    p = curve.p
+    Z1Z1 = Z1 * Z1 % p
+    Z2Z2 = Z2 * Z2 % p
+    U1 = X1 * Z2Z2 % p
+    U2 = X2 * Z1Z1 % p
+    S1 = Y1 * Z2 * Z2Z2 % p
+    S2 = Y2 * Z1 * Z1Z1 % p
+    H = (U2 - U1) % p
+    r = (S2 - S1) % p
+    if H == 0:
+        # Совпадающие x: либо удвоение, либо P = -Q
+        return _jacobian_double(curve, P) if r == 0 else _JACOBIAN_INFINITY
+    HH = H * H % p
+    HHH = H * HH % p
+    V = U1 * HH % p
+    X3 = (r * r - HHH - 2 * V) % p
+    Y3 = (r * (V - X3) - S1 * HHH) % p
+    Z3 = Z1 * Z2 * H % p
+    return (X3, Y3, Z3)
+
+def _jacobian_add_mixed(curve, P, Q):
+    """Смешанное сложение: P в якобиевых координатах, Q - аффинная точка (Z = 1)"""
+    if curve.counter is not None and P[2] and Q is not None:
+        curve.counter.record('add', *_COST_ADD_MIXED)
+    if curve.field is not None:
+        return curve.field.add_mixed(curve.a, P, Q)
+    X1, Y1, Z1 = P
+    if Q is None:
+        return P
+    if Z1 == 0:
+        return _to_jacobian(curve, Q)
+    p = curve.p
+    x2, y2 = Q
+    Z1Z1 = Z1 * Z1 % p
+    U2 = x2 * Z1Z1 % p
+    S2 = y2 * Z1 * Z1Z1 % p
+    H = (U2 - X1) % p
+    r = (S2 - Y1) % p
+    if H == 0:
+        return _jacobian_double(curve, P) if r == 0 else _JACOBIAN_INFINITY
+    HH = H * H % p
+    HHH = H * HH % p
+    V = X1 * HH % p
+    X3 = (r * r - HHH - 2 * V) % p
+    Y3 = (r * (V - X3) - Y1 * HHH) % p
+    Z3 = Z1 * H % p
+    return (X3, Y3, Z3)
+
+class SpecialPrimeField:
+    """
+    Якобиева арифметика для простых p = 2^k - c с малым c (псевдо-Мерсенн,
+    Солинас). В ecc_curves включена для P-384 и P-521: на меньших полях
+    две свертки на умножение в Python медленнее одного %.
+    Вместо деления x % p используется свертка 2^k ≡ c: x -> (x mod 2^k) + (x >> k)*c,
+    дважды после каждого умножения. Промежуточные координаты остаются
+    неполностью приведенными (сравнимы по модулю p и ограничены ~2^(k+1)),
+    полное приведение выполняется при переходе к аффинным координатам.
+    """
+
+    def __init__(self, k, c):
+        if c.bit_length() > k // 2 - 8:
+            raise ValueError("Свертка выгодна только для p = 2^k - c с малым c")
+        self.k = k
+        self.c = c
+        self.p = (1 << k) - c
+        self.mask = (1 << k) - 1
+
+    def double(self, a, P):
+        X1, Y1, Z1 = P
+        p = self.p
+        if Z1 == 0 or Y1 % p == 0:
+            return _JACOBIAN_INFINITY
+        K, M, C = self.k, self.mask, self.c
+        t = X1 * X1; t = (t & M) + (t >> K) * C; XX = (t & M) + (t >> K) * C
+        t = Y1 * Y1; t = (t & M) + (t >> K) * C; YY = (t & M) + (t >> K) * C
+        t = YY * YY; t = (t & M) + (t >> K) * C; YYYY = (t & M) + (t >> K) * C
+        t = 4 * X1 * YY; t = (t & M) + (t >> K) * C; S = (t & M) + (t >> K) * C
+        if a:
+            t = Z1 * Z1; t = (t & M) + (t >> K) * C; ZZ = (t & M) + (t >> K) * C
+            t = ZZ * ZZ; t = (t & M) + (t >> K) * C; t = (t & M) + (t >> K) * C
+            t = 3 * XX + a * t
+        else:
+            t = 3 * XX
+        t = (t & M) + (t >> K) * C; N = (t & M) + (t >> K) * C
+        t = N * N - 2 * S; t = (t & M) + (t >> K) * C; X3 = (t & M) + (t >> K) * C
+        t = N * (S - X3) - 8 * YYYY; t = (t & M) + (t >> K) * C; Y3 = (t & M) + (t >> K) * C
+        t = 2 * Y1 * Z1; t = (t & M) + (t >> K) * C; Z3 = (t & M) + (t >> K) * C
+        return (X3, Y3, Z3)
+
+    def add(self, a, P, Q):
+        X1, Y1, Z1 = P
+        X2, Y2, Z2 = Q
+        if Z1 == 0:
+            return Q
+        if Z2 == 0:
+            return P
+        p = self.p
+        K, M, C = self.k, self.mask, self.c
+        t = Z1 * Z1; t = (t & M) + (t >> K) * C; Z1Z1 = (t & M) + (t >> K) * C
+        t = Z2 * Z2; t = (t & M) + (t >> K) * C; Z2Z2 = (t & M) + (t >> K) * C
+        t = X1 * Z2Z2; t = (t & M) + (t >> K) * C; U1 = (t & M) + (t >> K) * C
+        t = X2 * Z1Z1; t = (t & M) + (t >> K) * C; U2 = (t & M) + (t >> K) * C
+        t = Z2 * Z2Z2; t = (t & M) + (t >> K) * C; t = (t & M) + (t >> K) * C
+        t = Y1 * t; t = (t & M) + (t >> K) * C; S1 = (t & M) + (t >> K) * C
+        t = Z1 * Z1Z1; t = (t & M) + (t >> K) * C; t = (t & M) + (t >> K) * C
+        t = Y2 * t; t = (t & M) + (t >> K) * C; S2 = (t & M) + (t >> K) * C
+        t = Z1 * Z2; t = (t & M) + (t >> K) * C; Z = (t & M) + (t >> K) * C
+        return self._finish_add(a, P, U1, S1, U2 - U1, S2 - S1, Z)
+
+    def add_mixed(self, a, P, Q):
+        X1, Y1, Z1 = P
+        if Q is None:
+            return P
+        if Z1 == 0:
+            return (Q[0] % self.p, Q[1] % self.p, 1)
+        x2, y2 = Q
+        K, M, C = self.k, self.mask, self.c
+        t = Z1 * Z1; t = (t & M) + (t >> K) * C; Z1Z1 = (t & M) + (t >> K) * C
+        t = x2 * Z1Z1; t = (t & M) + (t >> K) * C; U2 = (t & M) + (t >> K) * C
+        t = Z1 * Z1Z1; t = (t & M) + (t >> K) * C; t = (t & M) + (t >> K) * C
+        t = y2 * t; t = (t & M) + (t >> K) * C; S2 = (t & M) + (t >> K) * C
+        return self._finish_add(a, P, X1, Y1, U2 - X1, S2 - Y1, Z1)
+
+    def _finish_add(self, a, P, U1, S1, H, r, Z):
+        """Общая часть сложения по H = U2 - U1, r = S2 - S1 и Z = Z1*Z2"""
+        p = self.p
+        if H % p == 0:
+            # Совпадающие x: либо удвоение, либо P = -Q
+            return self.double(a, P) if r % p == 0 else _JACOBIAN_INFINITY
+        K, M, C = self.k, self.mask, self.c
+        t = H * H; t = (t & M) + (t >> K) * C; HH = (t & M) + (t >> K) * C
+        t = H * HH; t = (t & M) + (t >> K) * C; HHH = (t & M) + (t >> K) * C
+        t = U1 * HH; t = (t & M) + (t >> K) * C; V = (t & M) + (t >> K) * C
+        t = r * r - HHH - 2 * V; t = (t & M) + (t >> K) * C; X3 = (t & M) + (t >> K) * C
+        t = r * (V - X3) - S1 * HHH; t = (t & M) + (t >> K) * C; Y3 = (t & M) + (t >> K) * C
+        t = Z * H; t = (t & M) + (t >> K) * C; Z3 = (t & M) + (t >> K) * C
+        return (X3, Y3, Z3)
+
+class GLVEndomorphism:
+    """
+    Эндоморфизм Галланта-Ламберта-Ванстоуна для кривых y^2 = x^3 + b
+    над F_p, p ≡ 1 (mod 3), с простым порядком группы n:
+    phi(x, y) = (beta*x, y) = lambda*(x, y), где beta^3 ≡ 1 (mod p), lambda^3 ≡ 1 (mod n).
+    k*P = k1*P + k2*phi(P) с |k1|, |k2| ~ sqrt(n): вдвое меньше удвоений
+    """
+
+    def __init__(self, curve, n):
+        p = curve.p
+        self.p = p
+        self.n = n
+        self.beta = self._cube_root_of_unity(p)
+        self.lam = self._cube_root_of_unity(n)
+
+        # Из двух нетривиальных корней beta подбираем тот, что соответствует lambda
+        x = 0
+        while not curve.get_y(x):
+            x += 1
+        P = (x, curve.get_y(x)[0])
+        Q = _from_jacobian(curve, _multiply_jacobian(curve, self.lam, P))
+        if Q != (self.beta * P[0] % p, P[1]):
+            self.beta = self.beta * self.beta % p
+
+        self.basis = self._short_basis(n, self.lam)
+
+    @staticmethod
+    def _cube_root_of_unity(m):
+        """Нетривиальный кубический корень из единицы по простому модулю m ≡ 1 (mod 3)"""
+        g = 2
+        while True:
+            root = pow(g, (m - 1) // 3, m)
+            if root != 1:
+                return root
+            g += 1
+
+    @staticmethod
+    def _short_basis(n, lam):
+        """
+        Короткий базис решетки {(x, y): x + y*lambda ≡ 0 (mod n)}
+        из расширенного алгоритма Евклида для n и lambda
+        """
+        limit = math.isqrt(n)
+        r0, r1 = n, lam
+        t0, t1 = 0, 1
+        while r1 >= limit:
+            q = r0 // r1
+            r0, r1 = r1, r0 - q * r1
+            t0, t1 = t1, t0 - q * t1
+        # r0 - последний остаток >= sqrt(n), r1 - первый меньший
+        a1, b1 = r1, -t1
+        q = r0 // r1
+        r2, t2 = r0 - q * r1, t0 - q * t1
+        if r0 * r0 + t0 * t0 <= r2 * r2 + t2 * t2:
+            a2, b2 = r0, -t0
+        else:
+            a2, b2 = r2, -t2
+        return a1, b1, a2, b2
+
+    def apply(self, P):
+        """phi(P) = (beta*x, y) - одно умножение в поле"""
+        return P and (self.beta * P[0] % self.p, P[1])
+
+    def decompose(self, k):
+        """k ≡ k1 + k2*lambda (mod n), k1 и k2 порядка sqrt(n), возможно отрицательные"""
+        n = self.n
+        a1, b1, a2, b2 = self.basis
+        # Округление b2*k/n и -b1*k/n к ближайшему целому
+        c1 = (2 * b2 * k + n) // (2 * n)
+        c2 = (-2 * b1 * k + n) // (2 * n)
+        return k - c1 * a1 - c2 * a2, -c1 * b1 - c2 * b2
+
+def point_negate(curve, P):
+    """Противоположная точка -P = (x, -y)"""
+    if P is None:
+        return None
+    x, y = P
+    return (x, (-y) % curve.p) if curve.p else (x, -y)
+
+def _batch_inverse(values, p):
+    """Обращение списка ненулевых элементов одной инверсией (трюк Монтгомери)"""
+    prefix = []
+    acc = 1
+    for v in values:
+        prefix.append(acc)
+        acc = acc * v % p
+    acc_inv = pow(acc, -1, p)
+    result = [0] * len(values)
+    for i in range(len(values) - 1, -1, -1):
+        result[i] = acc_inv * prefix[i] % p
+        acc_inv = acc_inv * values[i] % p
+    return result
+
+def _batch_from_jacobian(curve, points):
+    """Перевод списка якобиевых точек в аффинные с одной общей инверсией"""
+    p = curve.p
+    finite = [i for i, P in enumerate(points) if P[2] != 0]
+    result = [None] * len(points)
+    if not finite:
+        return result
+    if curve.counter is not None:
+        # Трюк Монтгомери: 3(m - 1) умножений и одна инверсия на m элементов
+        m = len(finite)
+        curve.counter.record(None, 3 * (m - 1) + 3 * m, m, 1)
+    z_invs = _batch_inverse([points[i][2] for i in finite], p)
+    for i, z_inv in zip(finite, z_invs):
+        X, Y, _ = points[i]
+        z_inv2 = z_inv * z_inv % p
+        result[i] = (X * z_inv2 % p, Y * z_inv2 * z_inv % p)
+    return result
+
+def batch_point_add(curve, Ps, Qs):
+    """
+    Попарное сложение P_i + Q_i с одной общей инверсией на весь пакет
+    (трюк Монтгомери: N инверсий заменяются одной и ~3N умножениями)
+    """
+    if len(Ps) != len(Qs):
+        raise ValueError("Списки точек должны быть одинаковой длины")
+    if not curve.p:
+        return [point_add(curve, P, Q) for P, Q in zip(Ps, Qs)]
+
+    p = curve.p
+    results = [None] * len(Ps)
+    # (индекс, x1, y1, x2, числитель наклона) для пар, требующих деления
+    pending = []
+    denominators = []
+    for i, (P, Q) in enumerate(zip(Ps, Qs)):
+        if P is None:
+            results[i] = Q
+            continue
+        if Q is None:
+            results[i] = P
+            continue
+        x1, y1 = P[0] % p, P[1] % p
+        x2, y2 = Q[0] % p, Q[1] % p
+        if x1 == x2:
+            if y1 != y2 or y1 == 0:
+                continue  # P = -Q: точка в бесконечности
+            # Удвоение точки
+            pending.append((i, x1, y1, x2, 3 * x1 * x1 + curve.a))
+            denominators.append(2 * y1 % p)
+        else:
+            pending.append((i, x1, y1, x2, y2 - y1))
+            denominators.append((x2 - x1) % p)
+
+    if pending:
+        if curve.counter is not None:
+            doubles = sum(1 for i, x1, _, x2, _ in pending if x1 == x2)
+            curve.counter.record('double', 2, 2, count=doubles)
+            curve.counter.record('add', 2, 1, count=len(pending) - doubles)
+            curve.counter.record(None, 3 * (len(pending) - 1), inv=1)
+        for (i, x1, y1, x2, numerator), inv in zip(pending, _batch_inverse(denominators, p)):
+            s = numerator * inv % p
+            x3 = (s * s - x1 - x2) % p
+            results[i] = (x3, (s * (x1 - x3) - y1) % p)
+    return results
+
+def _multiply_jacobian(curve, k, P):
+    """Двоичный метод слева направо в якобиевых координатах (k > 0, P - аффинная)"""
+    Q = (P[0] % curve.p, P[1] % curve.p)
+    result = _JACOBIAN_INFINITY
+    for bit in bin(k)[2:]:
+        result = _jacobian_double(curve, result)
+        if bit == '1':
+            result = _jacobian_add_mixed(curve, result, Q)
+    return result
+
+def wnaf(k, width):
+    """
+    Представление k > 0 в виде width-NAF (младшие цифры первыми):
+    каждая ненулевая цифра нечетна, |d| < 2^(width-1), и за ней следуют
+    не менее width-1 нулей
+    """
+    if width < 2:
+        raise ValueError("Ширина wNAF должна быть не меньше 2")
+    digits = []
+    full = 1 << width
+    half = 1 << (width - 1)
+    while k:
+        if k & 1:
+            d = k & (full - 1)
+            if d >= half:
+                d -= full
+            k -= d
+        else:
+            d = 0
+        digits.append(d)
+        k >>= 1
+    return digits
+
+def _odd_multiples_jacobian(curve, P, width):
+    """Якобиевы точки P, 3P, ..., (2^(width-1) - 1)P"""
+    count = 1 << (width - 2)
+    Pj = _to_jacobian(curve, P)
+    multiples = [Pj]
+    if count > 1:
+        P2 = _jacobian_double(curve, Pj)
+        for _ in range(count - 1):
+            multiples.append(_jacobian_add(curve, multiples[-1], P2))
+    return multiples
+
+def _odd_multiples(curve, P, width):
+    """Аффинные точки P, 3P, ..., (2^(width-1) - 1)P с одной общей инверсией"""
+    return _batch_from_jacobian(curve, _odd_multiples_jacobian(curve, P, width))
+
+def _multiply_wnaf(curve, k, P, width, table=None):
+    """
+    Умножение по width-NAF в якобиевых координатах (k > 0, P - аффинная).
+    table - готовая таблица нечетных кратных P (например, из кэша)
+    """
+    digits = wnaf(k, width)
+    if table is None:
+        table = _odd_multiples(curve, P, width)
+    p = curve.p
+    result = _JACOBIAN_INFINITY
+    for d in reversed(digits):
+        result = _jacobian_double(curve, result)
+        if d > 0:
+            result = _jacobian_add_mixed(curve, result, table[d >> 1])
+        elif d < 0:
+            # Отрицание бесплатно: -(x, y) = (x, p - y)
+            Q = table[(-d) >> 1]
+            result = _jacobian_add_mixed(curve, result, Q and (Q[0], p - Q[1]))
+    return result
+
+def _glv_terms(curve, k, table, width):
+    """
+    Разложение k*P = k1*P + k2*phi(P): wNAF-цифры и таблицы для ненулевых слагаемых.
+    Таблица для phi(P) получается из таблицы P умножением x на beta
+    """
+    glv = curve.glv
+    p = curve.p
+    if curve.counter is not None:
+        curve.counter.record(None, len(table))
+    k1, k2 = glv.decompose(k % glv.n)
+    terms = []
+    for kk, t in ((k1, table), (k2, [glv.apply(Q) for Q in table])):
+        if kk < 0:
+            kk, t = -kk, [Q and (Q[0], p - Q[1]) for Q in t]
+        if kk:
+            terms.append((wnaf(kk, width), t))
+    return terms
+
+def _multiply_glv(curve, k, P, width, table=None):
+    """k*P совместным wNAF-проходом по двум скалярам половинной длины"""
+    if table is None:
+        table = _odd_multiples(curve, P, width)
+    terms = _glv_terms(curve, k, table, width)
+    if not terms:
+        return _JACOBIAN_INFINITY
+    return _interleaved_wnaf(curve, [d for d, _ in terms], [t for _, t in terms])
+
+def point_multiply(curve, k, P, method=None, width=None):
+    """
+    Умножение точки на скаляр (k*P)
+    method - 'wnaf', 'binary' или 'glv' (по умолчанию curve.scalar_method,
+    а при включенном эндоморфизме curve.glv - 'glv'),
+    width - ширина окна для wNAF (по умолчанию curve.wnaf_width)
+    """
     if k == 0 or P is None:
         return None
+    if curve.counter is not None:
+        curve.counter.scalar_mul += 1
+
+    if curve.p and curve.base_table is not None and curve.base_table.matches(P):
+        # Фиксированная базовая точка: используем предвычисленную таблицу
+        return curve.base_table.multiply(k)
+
+    if k < 0:
+        k, P = -k, point_negate(curve, P)
 
     if k == 1:
         return P
 
+    if curve.p:
+        # Конечное поле: вычисления в якобиевых координатах,
+        # единственная инверсия - при возврате к аффинным координатам
+        P = (P[0] % curve.p, P[1] % curve.p)
+        method = method or ('glv' if curve.glv is not None else curve.scalar_method)
+        width = width or curve.wnaf_width
+        table = None
+        if curve.table_cache is not None and method in ('glv', 'wnaf'):
+            table = curve.table_cache.lookup(P, width)
+            if isinstance(table, FixedBaseTable):
+                return table.multiply(k)
+        if method == 'glv':
+            if curve.glv is None:
+                raise ValueError("Эндоморфизм не подключен (см. EllipticCurve.setup_glv)")
+            result = _multiply_glv(curve, k, P, width, table)
+        elif method == 'wnaf':
+            result = _multiply_wnaf(curve, k, P, width, table)
+        elif method == 'binary':
+            result = _multiply_jacobian(curve, k, P)
+        else:
+            raise ValueError(f"Неизвестный метод умножения: {method}")
+        return _from_jacobian(curve, result)
+
     # Алгоритм двойного и сложения
     result = None
     addend = P
@@ -125,3 +906,497 @@ def point_multiply(curve, k, P):
         k >>= 1  # Сдвиг вправо
 
     return result
+
+
+# Начиная с этого числа слагаемых multi_scalar_multiply использует метод Пиппенджера
+PIPPENGER_THRESHOLD = 192
+
+def _straus(curve, scalars, points, width):
+    """
+    Метод Штрауса/Шамира: общие удвоения и чередующиеся wNAF-сложения.
+    С эндоморфизмом GLV каждый скаляр делится на два половинной длины
+    """
+    # Таблицы нечетных кратных всех точек нормализуются одной инверсией
+    count = 1 << (width - 2)
+    flat = []
+    for P in points:
+        flat.extend(_odd_multiples_jacobian(curve, P, width))
+    flat = _batch_from_jacobian(curve, flat)
+    tables = [flat[i * count:(i + 1) * count] for i in range(len(points))]
+    if curve.glv is None:
+        return _interleaved_wnaf(curve, [wnaf(k, width) for k in scalars], tables)
+
+    terms = []
+    for k, table in zip(scalars, tables):
+        terms.extend(_glv_terms(curve, k, table, width))
+    if not terms:
+        return _JACOBIAN_INFINITY
+    return _interleaved_wnaf(curve, [d for d, _ in terms], [t for _, t in terms])
+
+def _interleaved_wnaf(curve, digits, tables):
+    """Сумма по wNAF-цифрам digits и таблицам нечетных кратных tables с общими удвоениями"""
+    p = curve.p
+    result = _JACOBIAN_INFINITY
+    for i in range(max(len(d) for d in digits) - 1, -1, -1):
+        result = _jacobian_double(curve, result)
+        for ds, table in zip(digits, tables):
+            if i >= len(ds) or ds[i] == 0:
+                continue
+            d = ds[i]
+            if d > 0:
+                result = _jacobian_add_mixed(curve, result, table[d >> 1])
+            else:
+                Q = table[(-d) >> 1]
+                result = _jacobian_add_mixed(curve, result, Q and (Q[0], p - Q[1]))
+    return result
+
+def _pippenger(curve, scalars, points, window=None):
+    """Метод Пиппенджера: окна по c бит, точки раскладываются по корзинам"""
+    if window is None:
+        window = max(2, len(points).bit_length() - 3)
+    mask = (1 << window) - 1
+    bits = max(k.bit_length() for k in scalars)
+
+    result = _JACOBIAN_INFINITY
+    for shift in range((bits - 1) // window * window, -1, -window):
+        for _ in range(window):
+            result = _jacobian_double(curve, result)
+
+        buckets = [_JACOBIAN_INFINITY] * (mask + 1)
+        for k, P in zip(scalars, points):
+            digit = (k >> shift) & mask
+            if digit:
+                buckets[digit] = _jacobian_add_mixed(curve, buckets[digit], P)
+
+        # sum(j * bucket[j]) через накопительные суммы
+        running = _JACOBIAN_INFINITY
+        window_sum = _JACOBIAN_INFINITY
+        for j in range(mask, 0, -1):
+            running = _jacobian_add(curve, running, buckets[j])
+            window_sum = _jacobian_add(curve, window_sum, running)
+        result = _jacobian_add(curve, result, window_sum)
+    return result
+
+def multi_scalar_multiply(curve, scalars, points, method=None):
+    """
+    Вычисляет сумму k_1*P_1 + ... + k_n*P_n
+    method - 'straus' или 'pippenger' (по умолчанию выбирается по числу слагаемых)
+    """
+    if len(scalars) != len(points):
+        raise ValueError("Число скаляров и точек должно совпадать")
+
+    if not curve.p:
+        # Действительные числа: складываем отдельные произведения
+        result = None
+        for k, P in zip(scalars, points):
+            result = point_add(curve, result, point_multiply(curve, k, P))
+        return result
+
+    # Слагаемые с базовой точкой таблицы собираем в один скаляр: k*G считается по таблице
+    table = curve.base_table
+    fixed = 0
+
+    # Нулевые слагаемые отбрасываем, отрицательные скаляры переносим на точку
+    terms_k, terms_P = [], []
+    for k, P in zip(scalars, points):
+        if k == 0 or P is None:
+            continue
+        if table is not None and table.matches(P):
+            fixed += k
+            continue
+        if k < 0:
+            k, P = -k, point_negate(curve, P)
+        terms_k.append(k)
+        terms_P.append((P[0] % curve.p, P[1] % curve.p))
+
+    if table is not None and table.order:
+        fixed %= table.order
+    if fixed < 0:
+        terms_k.append(-fixed)
+        terms_P.append(point_negate(curve, table.G))
+        fixed = 0
+
+    if not terms_k:
+        return table.multiply(fixed) if fixed else None
+    if len(terms_k) == 1 and not fixed:
+        return point_multiply(curve, terms_k[0], terms_P[0])
+
+    if method is None:
+        method = 'pippenger' if len(terms_k) >= PIPPENGER_THRESHOLD else 'straus'
+    if method == 'straus':
+        result = _straus(curve, terms_k, terms_P, curve.wnaf_width)
+    elif method == 'pippenger':
+        result = _pippenger(curve, terms_k, terms_P)
+    else:
+        raise ValueError(f"Неизвестный метод мультискалярного умножения: {method}")
+    if fixed:
+        result = table.accumulate(fixed, result)
+    return _from_jacobian(curve, result)
+
+def _x_only_lift(curve, k, x, rhs):
+    """x(k*P) через восстановление y одним корнем и обычное умножение"""
+    P = point_multiply(curve, k, (x, curve.sqrt_mod(rhs, curve.p)[0]))
+    return None if P is None else P[0]
+
+def x_only_multiply(curve, k, x, method='lift'):
+    """
+    x-координата k*P по одной x-координате P (y не нужна: x(k*P) = x(k*(-P))).
+    method='lift' (по умолчанию) - восстановление любого из двух y одним корнем
+    и обычное умножение point_multiply (wNAF/GLV);
+    method='ladder' - co-Z лестница Монтгомери (Гундар-Жуа-Мияджи) без извлечения
+    корня: точка (x*t, t^2), t = x³ + ax + b, лежит на изоморфной кривой
+    с a' = a*t^2, на бит - сложение с сопряженным и co-Z сложение (9M + 5S),
+    Z восстанавливается в конце по разности R1 - R0 = P.
+    На CPython лестница не быстрее 'lift' и поэтому не используется по умолчанию:
+    на secp256k1 она почти вдвое медленнее (GLV вдвое сокращает число удвоений),
+    на P-192, P-256, P-384 и brainpool - наравне или на 5-15% медленнее,
+    на P-521 - вдвое (свертка SpecialPrimeField ей недоступна). Выигрывает
+    (~0.6 времени) только при p ≡ 1 (mod 8), где корень для 'lift' дорог (P-224).
+    Возвращает None, если k*P - точка в бесконечности.
+    x, не лежащая на кривой (точка кручения), отвергается
+    """
+    p = curve.p
+    x %= p
+    rhs = (x * x * x + curve.a * x + curve.b) % p
+    if legendre_symbol(rhs, p) == -1:
+        raise ValueError(f"Нет точки кривой с x = {x}")
+
+    n = getattr(curve, 'n', None) or curve._order
+    if n:
+        k %= n
+    k = abs(k)
+    if k == 0:
+        return None
+    if k == 1:
+        return x
+
+    if method == 'lift' or x == 0 or rhs == 0:
+        # x = 0: Z не восстанавливается по разности; rhs = 0: точка порядка 2
+        return _x_only_lift(curve, k, x, rhs)
+    if method != 'ladder':
+        raise ValueError(f"Неизвестный метод x-умножения: {method}")
+
+    # P' = (x*t, t^2) на y² = x³ + a*t^2*x + b*t^3, x(k*P) = x(k*P') / t
+    t = rhs
+    x1, y1 = x * t % p, t * t % p
+    a = curve.a * y1 % p
+
+    # Начальное удвоение с Z = 1: R1 = 2P', R0 = P' с общим Z = 2*y1
+    xx = x1 * x1 % p
+    yy = y1 * y1 % p
+    S = 4 * x1 * yy % p
+    M = (3 * xx + a) % p
+    X1 = (M * M - 2 * S) % p
+    Y1 = (M * (S - X1) - 8 * yy * yy) % p
+    X0, Y0 = S, 8 * yy * yy % p
+
+    # Инвариант: R1 - R0 = P', у R0 и R1 общий Z. Для бита b (Ra = R_b, Rb = R_1-b):
+    # сумма и разность Ra ± Rb, затем (Ra + Rb) + (Ra - Rb) = 2*Ra
+    for bit in bin(k)[3:]:
+        if bit == '1':
+            Xa, Ya, Xb, Yb = X1, Y1, X0, Y0
+        else:
+            Xa, Ya, Xb, Yb = X0, Y0, X1, Y1
+        # Сложение с сопряженным: Ra + Rb и Ra - Rb с общим Z
+        dX = Xa - Xb
+        C = dX * dX % p
+        W1 = Xa * C % p
+        W2 = Xb * C % p
+        A1 = Ya * (W1 - W2) % p
+        dY = Ya - Yb
+        sY = Ya + Yb
+        Xs = (dY * dY - W1 - W2) % p
+        Ys = (dY * (W1 - Xs) - A1) % p
+        Xd = (sY * sY - W1 - W2) % p
+        Yd = (sY * (W1 - Xd) - A1) % p
+        # Co-Z сложение: 2*Ra и обновленная сумма с тем же новым Z
+        dX = Xs - Xd
+        C = dX * dX % p
+        W1 = Xs * C % p
+        W2 = Xd * C % p
+        A1 = Ys * (W1 - W2) % p
+        dY = Ys - Yd
+        Xa = (dY * dY - W1 - W2) % p
+        Ya = (dY * (W1 - Xa) - A1) % p
+        if bit == '1':
+            X1, Y1, X0, Y0 = Xa, Ya, W1, A1
+        else:
+            X0, Y0, X1, Y1 = Xa, Ya, W1, A1
+    if curve.counter is not None:
+        bits = k.bit_length()
+        curve.counter.scalar_mul += 1
+        curve.counter.record('double', 4, 5)
+        curve.counter.record('add', 5, 3, count=bits - 1)
+        curve.counter.record('add', 4, 2, count=bits - 1)
+        curve.counter.record(None, 3, 1, inv=1)
+
+    # Разность последнего шага Ra - Rb = ±P' дает Z перед co-Z сложением: Z^2 = Xd / x1,
+    # затем Z умножилось на dX. Итог: x(k*P) = X0 / (Z^2 * t) = X0 * x / (Xd * dX^2)
+    denominator = Xd * dX % p * dX % p
+    if denominator == 0:
+        # Промежуточная сумма попала в O (k*P = O или P малого порядка)
+        return _x_only_lift(curve, k, x, rhs)
+    return X0 * x % p * pow(denominator, -1, p) % p
+
+
+def point_order(curve, P, group_order=None):
+    """Порядок точки P: делитель порядка группы (по умолчанию curve.order())"""
+    if P is None:
+        return 1
+    n = group_order or curve.order()
+    for q, e in factorize(n).items():
+        for _ in range(e):
+            if point_multiply(curve, n // q, P) is not None:
+                break
+            n //= q
+    return n
+
+
+class FixedBaseTable:
+    """
+    Оконная таблица кратных фиксированной точки G:
+    для каждого окна i хранятся j * 2^(w*i) * G, j = 1..2^w - 1.
+    Тогда k*G - это сумма не более ceil(bits/w) табличных точек, без удвоений.
+
+    Таблица хранится в компактном бинарном виде (координаты фиксированной
+    ширины, big-endian) и может быть отображена в память из файла,
+    чтобы процессы-воркеры не строили ее заново.
+    """
+
+    MAGIC = b'ECFB'
+    VERSION = 1
+    _HEADER = struct.Struct('>4sBBHH')  # magic, версия, w, число окон, ширина координаты
+
+    def __init__(self, curve, G, window, windows, buffer, order=None):
+        self.curve = curve
+        self.G = G
+        self.window = window
+        self.windows = windows
+        self.order = order
+        self.width = (curve.p.bit_length() + 7) // 8
+        self._buffer = buffer
+        self._offset = self._HEADER.size + 5 * self.width
+        self._per_window = (1 << window) - 1
+
+    @property
+    def bits(self):
+        """Максимальная длина скаляра, покрываемая таблицей"""
+        return self.window * self.windows
+
+    @staticmethod
+    def _window_count(curve, window, order):
+        # Без известного порядка ограничиваемся оценкой Хассе: n <= p + 1 + 2*sqrt(p)
+        bits = order.bit_length() if order else curve.p.bit_length() + 1
+        return (bits + window - 1) // window
+
+    @classmethod
+    def estimate_size(cls, curve, window=4, order=None):
+        """Размер буфера таблицы в байтах (без ее построения)"""
+        width = (curve.p.bit_length() + 7) // 8
+        points = cls._window_count(curve, window, order) * ((1 << window) - 1)
+        return sys.getsizeof(b'') + cls._HEADER.size + 5 * width + 2 * width * points
+
+    @classmethod
+    def build(cls, curve, G, window=4, order=None):
+        """Строит таблицу для точки G конечной кривой curve"""
+        if not curve.p:
+            raise ValueError("Таблица базовой точки строится только для конечного поля")
+        if G is None:
+            raise ValueError("Базовая точка не может быть точкой в бесконечности")
+        if not 1 <= window <= 8:
+            raise ValueError("Ширина окна должна быть от 1 до 8")
+
+        G = (G[0] % curve.p, G[1] % curve.p)
+        windows = cls._window_count(curve, window, order)
+
+        jacobian = []
+        base = _to_jacobian(curve, G)
+        for _ in range(windows):
+            current = base
+            for _ in range((1 << window) - 1):
+                jacobian.append(current)
+                current = _jacobian_add(curve, current, base)
+            # current = 2^w * base - основание следующего окна
+            base = current
+
+        points = _batch_from_jacobian(curve, jacobian)
+        header = cls._pack_header(curve, G, window, windows)
+        body = b''.join(cls._pack_point(P, curve.p) for P in points)
+        return cls(curve, G, window, windows, header + body, order)
+
+    @classmethod
+    def _pack_header(cls, curve, G, window, windows):
+        p = curve.p
+        width = (p.bit_length() + 7) // 8
+        fields = (p, curve.a % p, curve.b % p, G[0], G[1])
+        return (cls._HEADER.pack(cls.MAGIC, cls.VERSION, window, windows, width)
+                + b''.join(v.to_bytes(width, 'big') for v in fields))
+
+    @staticmethod
+    def _pack_point(P, p):
+        width = (p.bit_length() + 7) // 8
+        if P is None:
+            # Значение p не является элементом поля - метка точки в бесконечности
+            return p.to_bytes(width, 'big') * 2
+        return P[0].to_bytes(width, 'big') + P[1].to_bytes(width, 'big')
+
+    def save(self, path):
+        """Сохраняет таблицу в бинарный файл"""
+        with open(path, 'wb') as f:
+            f.write(self._buffer)
+
+    @classmethod
+    def load(cls, curve, path, order=None):
+        """Загружает таблицу из файла, отображая его в память (только чтение)"""
+        with open(path, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, window, windows, width = cls._HEADER.unpack_from(buffer, 0)
+        if magic != cls.MAGIC or version != cls.VERSION:
+            raise ValueError(f"{path}: неизвестный формат таблицы базовой точки")
+
+        offset = cls._HEADER.size
+        fields = [int.from_bytes(buffer[offset + i * width:offset + (i + 1) * width], 'big')
+                  for i in range(5)]
+        p, a, b, gx, gy = fields
+        if (p, a, b) != (curve.p, curve.a % curve.p, curve.b % curve.p):
+            raise ValueError(f"{path}: таблица построена для другой кривой")
+
+        expected = offset + 5 * width + windows * ((1 << window) - 1) * 2 * width
+        if len(buffer) != expected:
+            raise ValueError(f"{path}: файл таблицы поврежден")
+
+        return cls(curve, (gx, gy), window, windows, buffer, order)
+
+    def matches(self, P):
+        """Является ли P базовой точкой этой таблицы"""
+        p = self.curve.p
+        return P is not None and (P[0] % p, P[1] % p) == self.G
+
+    def lookup(self, i, j):
+        """Возвращает j * 2^(w*i) * G (j >= 1)"""
+        width = self.width
+        start = self._offset + (i * self._per_window + j - 1) * 2 * width
+        x = int.from_bytes(self._buffer[start:start + width], 'big')
+        if x == self.curve.p:
+            return None
+        y = int.from_bytes(self._buffer[start + width:start + 2 * width], 'big')
+        return (x, y)
+
+    def multiply(self, k):
+        """Вычисляет k*G"""
+        curve = self.curve
+        if self.order:
+            k %= self.order
+        if k == 0:
+            return None
+        if k < 0:
+            return point_negate(curve, self.multiply(-k))
+        return _from_jacobian(curve, self.accumulate(k, _JACOBIAN_INFINITY))
+
+    def accumulate(self, k, result):
+        """Прибавляет k*G (k > 0) к якобиевой точке result"""
+        curve = self.curve
+        if k.bit_length() > self.bits:
+            # Скаляр не покрывается таблицей - обычное умножение
+            return _jacobian_add(curve, result, _multiply_jacobian(curve, k, self.G))
+
+        mask = self._per_window
+        i = 0
+        while k:
+            digit = k & mask
+            if digit:
+                result = _jacobian_add_mixed(curve, result, self.lookup(i, digit))
+            k >>= self.window
+            i += 1
+        return result
+
+
+def _odd_table_size(table):
+    """Память списка аффинных точек: сам список, кортежи и целые координаты"""
+    size = sys.getsizeof(table)
+    for P in table:
+        if P is not None:
+            size += sys.getsizeof(P) + sys.getsizeof(P[0]) + sys.getsizeof(P[1])
+    return size
+
+class TableCache:
+    """
+    LRU-кэш таблиц предвычислений для произвольных точек кривой.
+    При первом умножении точки сохраняется ее таблица нечетных кратных для wNAF;
+    после promote_after обращений точка считается горячей и для нее строится
+    оконная таблица FixedBaseTable, после чего умножение идет без удвоений,
+    как для базовой точки. Общий размер таблиц (реальный размер объектов Python:
+    список кортежей целых или буфер FixedBaseTable) ограничен memory_limit байт,
+    давно не использованные вытесняются. Если оконная таблица не помещается
+    в memory_limit, точка остается с таблицей нечетных кратных.
+    promote_after=None отключает построение оконных таблиц
+    """
+
+    def __init__(self, curve, memory_limit=16 * 2**20, promote_after=8, window=4):
+        self.curve = curve
+        self.memory_limit = memory_limit
+        self.promote_after = promote_after
+        self.window = window
+        # (x, y, width) -> [таблица, размер, число обращений]
+        self._entries = collections.OrderedDict()
+        self.memory = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lookup(self, P, width):
+        """Таблица для аффинной точки P: список нечетных кратных или FixedBaseTable"""
+        key = (P[0], P[1], width)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            table = _odd_multiples(self.curve, P, width)
+            self._store(key, [table, _odd_table_size(table), 1])
+            return table
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        entry[2] += 1
+        if (self.promote_after is not None and entry[2] == self.promote_after
+                and not isinstance(entry[0], FixedBaseTable)
+                and FixedBaseTable.estimate_size(self.curve, self.window, self.curve._order) <= self.memory_limit):
+            table = FixedBaseTable.build(self.curve, P, self.window, self.curve._order)
+            self.memory -= entry[1]
+            del self._entries[key]
+            self._store(key, [table, sys.getsizeof(table._buffer), entry[2]])
+            return table
+        return entry[0]
+
+    def _store(self, key, entry):
+        if entry[1] > self.memory_limit:
+            return
+        self._entries[key] = entry
+        self.memory += entry[1]
+        while self.memory > self.memory_limit:
+            _, evicted = self._entries.popitem(last=False)
+            self.memory -= evicted[1]
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self.memory = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'memory': self.memory,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def __str__(self):
+        stats = self.stats()
+        return (f"{stats['entries']} таблиц, {stats['memory']} байт; попаданий {stats['hits']}, "
+                f"промахов {stats['misses']} ({stats['hit_rate']:.0%}), вытеснено {stats['evictions']}")
@@ -0,0 +1,260 @@
+import math
+import multiprocessing
+import random
+
+import ecc_tool as ecc
+
+
+def _solve_collision(curve, G, P, n, a1, b1, a2, b2):
+    """
+    Из a1*G + b1*P = a2*G + b2*P получаем (b1 - b2)*k ≡ a2 - a1 (mod n).
+    Если коэффициент при k необратим, перебираем gcd возможных решений.
+    """
+    db = (b1 - b2) % n
+    da = (a2 - a1) % n
+    g = math.gcd(db, n)
+    if db == 0 or da % g:
+        return None
+    reduced = n // g
+    k0 = (da // g) * pow(db // g, -1, reduced) % reduced
+    for i in range(min(g, 1 << 16)):
+        k = k0 + i * reduced
+        if ecc.point_multiply(curve, k, G) == P:
+            return k
+    return None
+
+
+def bsgs(curve, G, P, order=None, memory_limit=2**20):
+    """
+    Шаги младенца/великана: находит k с k*G = P, 0 <= k < order.
+    Таблица младенцев (хеш-таблица точка -> j) ограничена memory_limit
+    записями: чем она меньше, тем больше шагов великана (время O(n/m), память O(m)).
+    Возвращает None, если решения нет.
+    """
+    n = order or curve.order()
+    if P is None:
+        return 0
+    m = min(math.isqrt(n - 1) + 1, memory_limit)
+
+    baby = {}
+    R = None
+    for j in range(m):
+        baby.setdefault(R, j)
+        R = ecc.point_add(curve, R, G)
+
+    # Шаг великана: P - i*m*G
+    step = ecc.point_negate(curve, ecc.point_multiply(curve, m, G))
+    C = P
+    for i in range((n + m - 1) // m):
+        if C in baby:
+            return i * m + baby[C]
+        C = ecc.point_add(curve, C, step)
+    return None
+
+
+def _walk_table(curve, G, P, n, partitions, rng):
+    """Слагаемые r-добавляющего блуждания: M_i = c_i*G + d_i*P"""
+    table = []
+    for _ in range(partitions):
+        c, d = rng.randrange(n), rng.randrange(n)
+        table.append((ecc.multi_scalar_multiply(curve, [c, d], [G, P]), c, d))
+    return table
+
+
+def _partition(R, partitions):
+    return 0 if R is None else R[0] % partitions
+
+
+def pollard_rho(curve, G, P, order=None, partitions=20, seed=None, max_steps=None):
+    """
+    ρ-метод Полларда с r-добавляющим блужданием R -> R + M_{h(R)}
+    и поиском цикла методом Брента. Ожидаемо ~sqrt(pi*n/2) сложений, O(1) памяти.
+    """
+    n = order or curve.order()
+    if P is None:
+        return 0
+    rng = random.Random(seed)
+    table = _walk_table(curve, G, P, n, partitions, rng)
+    max_steps = max_steps or 64 * (math.isqrt(n) + 1)
+
+    steps = 0
+    while steps < max_steps:
+        a, b = rng.randrange(n), rng.randrange(n)
+        R = ecc.multi_scalar_multiply(curve, [a, b], [G, P])
+        saved = (R, a, b)
+        power = length = 1
+        while steps < max_steps:
+            if power == length:
+                saved = (R, a, b)
+                power *= 2
+                length = 0
+            M, c, d = table[_partition(R, partitions)]
+            R = ecc.point_add(curve, R, M)
+            a, b = (a + c) % n, (b + d) % n
+            length += 1
+            steps += 1
+            if R == saved[0]:
+                k = _solve_collision(curve, G, P, n, saved[1], saved[2], a, b)
+                if k is not None:
+                    return k
+                break  # Бесполезная коллизия - новое начало
+    return None
+
+
+def _rho_job(params, seed):
+    """
+    Задание воркера: несколько блужданий идут синхронно (одна инверсия на шаг
+    для всех через batch_point_add), найденные выделенные точки возвращаются
+    """
+    a, b, p, G, P, n, partitions, dp_bits, table_seed, walks, steps = params
+    curve = ecc.EllipticCurve(a, b, p)
+    table = _walk_table(curve, G, P, n, partitions, random.Random(table_seed))
+    rng = random.Random(seed)
+    mask = (1 << dp_bits) - 1
+
+    def start():
+        c, d = rng.randrange(n), rng.randrange(n)
+        return ecc.multi_scalar_multiply(curve, [c, d], [G, P]), c, d
+
+    walkers = [start() for _ in range(walks)]
+    points = [w[0] for w in walkers]
+    coef_a = [w[1] for w in walkers]
+    coef_b = [w[2] for w in walkers]
+
+    found = []
+    for _ in range(steps):
+        indexes = [_partition(R, partitions) for R in points]
+        points = ecc.batch_point_add(curve, points, [table[i][0] for i in indexes])
+        for w, i in enumerate(indexes):
+            coef_a[w] = (coef_a[w] + table[i][1]) % n
+            coef_b[w] = (coef_b[w] + table[i][2]) % n
+            R = points[w]
+            if R is not None and R[0] & mask:
+                continue
+            if R is not None:
+                found.append((R, coef_a[w], coef_b[w]))
+            # Выделенная точка (или O) - блуждание начинается заново
+            points[w], coef_a[w], coef_b[w] = start()
+    return found
+
+
+def parallel_pollard_rho(curve, G, P, order=None, processes=None, walks=32,
+                         partitions=32, dp_bits=None, seed=None, max_rounds=None):
+    """
+    Параллельный ρ-метод с выделенными точками (ван Ооршот - Винер).
+    Воркеры пула multiprocessing ведут независимые блуждания по общей таблице
+    и присылают точки с dp_bits нулевыми младшими битами x; совпадение двух
+    выделенных точек с разными коэффициентами дает k.
+    processes=1 выполняет задания в текущем процессе.
+    max_rounds по умолчанию - около 64*sqrt(n) сложений, как max_steps в pollard_rho.
+    Возвращает None, если P вне подгруппы порядка n или решение не найдено
+    """
+    n = order or curve.order()
+    if P is None:
+        return 0
+    if ecc.point_multiply(curve, n, P) is not None:
+        return None
+    if dp_bits is None:
+        dp_bits = max(4, n.bit_length() // 4)
+    processes = processes or multiprocessing.cpu_count()
+    steps = 16 << dp_bits
+    if max_rounds is None:
+        per_round = walks * steps * (1 if processes == 1 else 2 * processes)
+        max_rounds = max(4, -(-64 * (math.isqrt(n) + 1) // per_round))
+    rng = random.Random(seed)
+    params = (curve.a, curve.b, curve.p, G, P, n, partitions, dp_bits,
+              rng.getrandbits(64), walks, steps)
+
+    seen = {}
+
+    def collect(found):
+        for R, a, b in found:
+            if R in seen and seen[R] != (a, b):
+                k = _solve_collision(curve, G, P, n, a, b, *seen[R])
+                if k is not None:
+                    return k
+            seen[R] = (a, b)
+        return None
+
+    rounds = 0
+    if processes == 1:
+        while rounds < max_rounds:
+            rounds += 1
+            k = collect(_rho_job(params, rng.getrandbits(64)))
+            if k is not None:
+                return k
+        return None
+
+    with multiprocessing.Pool(processes) as pool:
+        while rounds < max_rounds:
+            rounds += 1
+            jobs = [(params, rng.getrandbits(64)) for _ in range(2 * processes)]
+            for found in pool.imap_unordered(_rho_job_args, jobs):
+                k = collect(found)
+                if k is not None:
+                    return k
+    return None
+
+
+def _rho_job_args(args):
+    """Обертка для imap_unordered (принимает один аргумент)"""
+    return _rho_job(*args)
+
+
+# До этого порядка подзадача решается перебором, до BSGS_BITS бит - BSGS, дальше - ρ-методом
+_BRUTE_FORCE_LIMIT = 64
+_BSGS_BITS = 40
+
+
+def _solve_prime_order(curve, G, P, q):
+    """
+    k*G = P для G порядка q: самый быстрый метод для данного размера q.
+    None, если q*P != O (P вне подгруппы - иначе ρ-метод не завершится)
+    """
+    if ecc.point_multiply(curve, q, P) is not None:
+        return None
+    if q <= _BRUTE_FORCE_LIMIT:
+        R = None
+        for k in range(q):
+            if R == P:
+                return k
+            R = ecc.point_add(curve, R, G)
+        return None
+    if q.bit_length() <= _BSGS_BITS:
+        return bsgs(curve, G, P, q)
+    return parallel_pollard_rho(curve, G, P, q)
+
+
+def pohlig_hellman(curve, G, P, order=None):
+    """
+    Метод Полига-Хеллмана: порядок G раскладывается на множители q^e,
+    для каждого q^e задача сводится к e задачам в подгруппе порядка q,
+    ответы собираются по китайской теореме об остатках.
+    Стоимость определяется наибольшим простым делителем порядка, а не самим порядком.
+    order - порядок точки G (по умолчанию вычисляется).
+    Возвращает None, если P не лежит в подгруппе, порожденной G.
+    """
+    n = order or ecc.point_order(curve, G)
+    k, modulus = 0, 1
+    for q, e in ecc.factorize(n).items():
+        cofactor = n // q
+        G0 = ecc.point_multiply(curve, cofactor, G)  # порядок q
+        # Цифры x = x_0 + x_1*q + ... в системе счисления по основанию q
+        x = 0
+        for i in range(e):
+            residual = ecc.point_add(curve, P, ecc.point_negate(curve, ecc.point_multiply(curve, x, G)))
+            digit = _solve_prime_order(curve, G0, ecc.point_multiply(curve, n // q**(i + 1), residual), q)
+            if digit is None:
+                return None
+            x += digit * q**i
+        # Китайская теорема об остатках
+        qe = q**e
+        k += modulus * ((x - k) * pow(modulus, -1, qe) % qe)
+        modulus *= qe
+
+    return k if ecc.point_multiply(curve, k, G) == P else None
+
+
+def solve(curve, G, P, order=None):
+    """Дискретный логарифм k*G = P самым быстрым доступным способом"""
+    return pohlig_hellman(curve, G, P, order)
@@ -1,5 +1,6 @@
 import matplotlib.pyplot as plt
 import warnings
+from ecc_points import finite_field_points
 warnings.filterwarnings('ignore')
 
 plt.rcParams['font.family'] = ['DejaVu Sans']
@@ -10,12 +11,7 @@ def visualize_ecdlp_demonstration(p=11):
     a, b = -7, 10
 
     # Находим все точки
-    points = []
-    for x in range(p):
-        y_squared = (x**3 + a * x + b) % p
-        for y in range(p):
-            if (y * y) % p == y_squared:
-                points.append((x, y))
+    x_all, y_all = finite_field_points(a, b, p)
 
     G = (9, 4)  # Генераторная точка
     target = (8, 2)  # nG
@@ -23,9 +19,7 @@ def visualize_ecdlp_demonstration(p=11):
     fig, ax = plt.subplots(1, 1, figsize=(12, 10))
 
     # Все точки кривой
-    if points:
-        x_all = [pt[0] for pt in points]
-        y_all = [pt[1] for pt in points]
+    if len(x_all):
         ax.scatter(x_all, y_all, c='lightblue', s=100, alpha=0.6, zorder=3, label='Точки кривой')
 
     # Генераторная точка
@@ -54,7 +48,7 @@ def visualize_ecdlp_demonstration(p=11):
 Найти: n = ?
 
 Кривая: y² ≡ x³ - 7x + 10 (mod {p})
-Всего точек на кривой: {len(points)}
+Всего точек на кривой: {len(x_all)}
 
 Метод: Полный перебор
 Для F_{p}: максимум {p} проверок
@@ -81,12 +75,8 @@ def visualize_diffie_hellman_steps():
     a, b = 2, 3
 
     # Находим точки кривой
-    points = []
-    for x in range(p):
-        y_squared = (x**3 + a * x + b) % p
-        for y in range(p):
-            if (y * y) % p == y_squared:
-                points.append((x, y))
+    x_all, y_all = finite_field_points(a, b, p)
+    points = list(zip(x_all.tolist(), y_all.tolist()))
 
     G = points[0] if points else (0, 1)  # Базовая точка
 
@@ -112,8 +102,6 @@ def visualize_diffie_hellman_steps():
         ax = axes[i // 2, i % 2]
 
         if points:
-            x_all = [pt[0] for pt in points]
-            y_all = [pt[1] for pt in points]
             ax.scatter(x_all, y_all, c='lightgray', s=60, alpha=0.4, zorder=2)
 
         if i == 0:  # Инициализация
@@ -155,7 +143,8 @@ def visualize_diffie_hellman_steps():
 
     return fig
 
-# Создание дополнительных визуализаций
-fig1 = visualize_ecdlp_demonstration()
+if __name__ == "__main__":
+    # Создание дополнительных визуализаций
+    fig1 = visualize_ecdlp_demonstration()
 
-fig2 = visualize_diffie_hellman_steps()
+    fig2 = visualize_diffie_hellman_steps()
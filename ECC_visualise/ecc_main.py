@@ -2,7 +2,9 @@ import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 import numpy as np
 import math
-from scipy.optimize import fsolve
+import subprocess
+from ecc_points import (adaptive_curve_samples, density_raster, finite_field_orbit, finite_field_points,
+                        real_cubic_roots, real_orbit)
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -17,54 +19,25 @@ class ECCVisualizer:
         self.animations = []
 
     def _get_curve_points(self, a, b, p):
-        points = []
-        for x in range(p):
-            y_squared = (x**3 + a * x + b) % p
-            for y in range(p):
-                if (y * y) % p == y_squared:
-                    points.append((x, y))
-        return points
+        return finite_field_points(a, b, p)
 
     def _find_continuous_segments(self, x, y_squared, eps=1e-10):
-        segments = []
-        start = None
-
-        for i in range(len(y_squared)):
-            if y_squared[i] >= -eps:
-                if start is None:
-                    start = i
-            else:
-                if start is not None:
-                    segments.append((start, i-1))
-                    start = None
-
-        if start is not None:
-            segments.append((start, len(y_squared)-1))
-
-        return segments
+        # Отрезки индексов, где y² >= 0 (nan разделяет части кривой): границы по смене маски
+        valid = y_squared >= -eps
+        edges = np.diff(valid.astype(np.int8), prepend=0, append=0)
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1) - 1
+        return list(zip(starts.tolist(), ends.tolist()))
 
     def _find_x_axis_intersections(self, a, b, x_range):
-        def equation(x):
-            return x**3 + a * x + b
-
-        roots = []
-        x_test = np.linspace(x_range[0], x_range[1], 10000)
-        y_test = equation(x_test)
-
-        # Ищем смены знака
-        for i in range(len(y_test) - 1):
-            if y_test[i] * y_test[i + 1] < 0:
-                try:
-                    root = fsolve(equation, x_test[i])[0]
-                    if abs(equation(root)) < 1e-10:
-                        roots.append(root)
-                except:
-                    continue
-
-        # Убираем дубликаты и сортируем
-        roots = list(set([round(root, 8) for root in roots]))
-        roots.sort()
-        return roots
+        # Корни x³ + ax + b = 0 в замкнутой форме; для массивов a, b - список корней каждой кривой
+        roots = np.round(real_cubic_roots(a, b), 8) + 0.0
+        inside = (roots >= x_range[0]) & (roots <= x_range[1])
+
+        # Убираем дубликаты (кратные корни) и сортируем
+        if roots.ndim == 1:
+            return sorted(set(roots[inside].tolist()))
+        return [sorted(set(r[m].tolist())) for r, m in zip(roots, inside)]
 
     def _setup_basic_plot_styling(self, ax, x_range=(-4, 4), y_range=(-4, 4)):
         ax.axhline(0, color='k', linewidth=1, alpha=0.7)
@@ -96,8 +69,7 @@ class ECCVisualizer:
 
     def plot_elliptic_curve(self, a, b, x_range=(-4, 4), title=None,
                                    show_roots=False, save_path=None):
-        x = np.linspace(x_range[0], x_range[1], 15000)
-        y_squared = x**3 + a * x + b
+        x, y_squared = adaptive_curve_samples(a, b, x_range)
 
         fig, ax = plt.subplots(1, 1, figsize=(12, 8))
 
@@ -131,16 +103,18 @@ class ECCVisualizer:
         fig, axes = plt.subplots(2, 2, figsize=(16, 12))
         axes = axes.flatten()
 
+        # Корни всех кривых одним вызовом
+        all_intersections = self._find_x_axis_intersections(
+            [params[0] for params in curve_params], [params[1] for params in curve_params], (-4, 4))
+
         for i, (a, b, title, color) in enumerate(curve_params):
             ax = axes[i]
 
-            x = np.linspace(-4, 4, 10000)
-            y_squared = x**3 + a * x + b
+            x, y_squared = adaptive_curve_samples(a, b, (-4, 4))
 
             self._draw_curve_segments(ax, x, y_squared, a, b, color=color, add_label=False)
 
-            x_intersections = self._find_x_axis_intersections(a, b, (-4, 4))
-            for root in x_intersections:
+            for root in all_intersections[i]:
                 if -4 <= root <= 4:
                     ax.plot(root, 0, color=color, linewidth=2.5, alpha=0.8)
 
@@ -168,8 +142,7 @@ class ECCVisualizer:
         for i, (a, b, title, color) in enumerate(singular_curves):
             ax = axes[i]
 
-            x = np.linspace(-3, 3, 15000)
-            y_squared = x**3 + a * x + b
+            x, y_squared = adaptive_curve_samples(a, b, (-3, 3))
 
             self._draw_curve_segments(ax, x, y_squared, a, b, color=color, add_label=False)
 
@@ -229,8 +202,7 @@ SECP256K1 - стандарт ECC
         fig, ax = plt.subplots(1, 1, figsize=(12, 10))
 
         a, b = -1, 1
-        x = np.linspace(-2.5, 2.5, 15000)
-        y_squared = x**3 + a * x + b
+        x, y_squared = adaptive_curve_samples(a, b, (-2.5, 2.5))
 
         self._draw_curve_segments(ax, x, y_squared, a, b, add_label=False)
 
@@ -283,7 +255,8 @@ SECP256K1 - стандарт ECC
 
         return fig
 
-    def visualize_finite_field_curves(self, p_values=[11, 17, 23]):
+    def visualize_finite_field_curves(self, p_values=[11, 17, 23], raster_threshold=20000, resolution=1024):
+        # Больше raster_threshold точек - рисуем растр плотности (imshow) вместо маркеров
 
         fig, axes = plt.subplots(1, len(p_values), figsize=(6*len(p_values), 6))
         if len(p_values) == 1:
@@ -293,18 +266,14 @@ SECP256K1 - стандарт ECC
 
         for i, p in enumerate(p_values):
             ax = axes[i]
-            points = []
-
-            for x in range(p):
-                y_squared = (x**3 + a * x + b) % p
-                for y in range(p):
-                    if (y * y) % p == y_squared:
-                        points.append((x, y))
-
-            if points:
-                x_coords = [pt[0] for pt in points]
-                y_coords = [pt[1] for pt in points]
-
+            x_coords, y_coords = self._get_curve_points(a, b, p)
+
+            raster = len(x_coords) > raster_threshold
+            if raster:
+                grid = density_raster(x_coords, y_coords, p, resolution)
+                ax.imshow(grid, cmap='Reds', origin='lower', interpolation='nearest',
+                          extent=(-0.5, p - 0.5, -0.5, p - 0.5), aspect='auto', vmin=0, vmax=np.percentile(grid[grid > 0], 99))
+            elif len(x_coords):
                 ax.scatter(x_coords, y_coords, c='red', s=10, alpha=0.7, zorder=5)
 
 
@@ -313,10 +282,10 @@ SECP256K1 - стандарт ECC
             ax.set_ylim(-0.5, p-0.5)
             ax.set_xlabel('x')
             ax.set_ylabel('y')
-            ax.set_title(f'y² ≡ x³ + 2x + 3 (mod {p})\n{len(points)} точек + O∞',
+            ax.set_title(f'y² ≡ x³ + 2x + 3 (mod {p})\n{len(x_coords)} точек + O∞',
                         fontsize=12, weight='bold')
 
-            if points:
+            if len(x_coords) and not raster:
                 ax.legend(fontsize=10)
 
         plt.suptitle('Эллиптические кривые в конечных полях', fontsize=16, weight='bold')
@@ -326,6 +295,172 @@ SECP256K1 - стандарт ECC
 
         return fig
 
+    def _save_animation(self, fig, update, artists, frames, save_path, fps, dpi=100):
+        # Экспорт с тем же блиттингом: фон рисуется один раз, в кадре - только artists.
+        # .gif - pillow с палитрой первого кадра, иначе (.mp4) - поток кадров в ffmpeg
+        fig.set_dpi(dpi)
+        canvas = fig.canvas
+        canvas.draw()
+        background = canvas.copy_from_bbox(fig.bbox)
+
+        def render(indices):
+            for i in indices:
+                update(i)
+                canvas.restore_region(background)
+                for artist in artists:
+                    artist.axes.draw_artist(artist)
+                yield canvas.buffer_rgba()
+
+        width, height = canvas.get_width_height()
+        images = render(range(frames))
+        if save_path.lower().endswith('.gif'):
+            from PIL import Image
+
+            def to_rgb(buffer):
+                return Image.frombuffer('RGBA', (width, height), buffer, 'raw', 'RGBA', 0, 1).convert('RGB')
+
+            # Общая палитра по первому, среднему и последнему кадрам (в них есть все цвета);
+            # без оптимизации палитры pillow не пересчитывает каждый кадр на Python
+            samples = [np.asarray(to_rgb(buffer)) for buffer in render({0, frames // 2, frames - 1})]
+            palette = Image.fromarray(np.vstack(samples)).quantize()
+            gif = (to_rgb(buffer).quantize(palette=palette, dither=Image.Dither.NONE) for buffer in images)
+            first = next(gif)
+            first.save(save_path, save_all=True, append_images=gif, optimize=False,
+                       duration=round(1000 / fps), loop=0)
+            return
+
+        command = [plt.rcParams['animation.ffmpeg_path'], '-y', '-loglevel', 'error',
+                   '-f', 'rawvideo', '-pix_fmt', 'rgba', '-s', f'{width}x{height}',
+                   '-r', str(fps), '-i', '-', '-pix_fmt', 'yuv420p',
+                   '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', save_path]
+        with subprocess.Popen(command, stdin=subprocess.PIPE) as ffmpeg:
+            for buffer in images:
+                ffmpeg.stdin.write(buffer)
+            ffmpeg.stdin.close()
+        if ffmpeg.returncode:
+            raise RuntimeError(f"ffmpeg завершился с кодом {ffmpeg.returncode}")
+
+    def animate_scalar_multiplication(self, a, b, p, G, k, fps=20, save_path=None, raster_threshold=20000):
+        # Орбита G, 2G, ..., kG над Fp считается один раз; кадр i показывает (i+1)G
+        if k < 1:
+            raise ValueError("k должно быть натуральным")
+        if (G[1]**2 - G[0]**3 - a * G[0] - b) % p:
+            raise ValueError(f"Точка {G} не лежит на кривой")
+
+        xs, ys = finite_field_orbit(a, p, G[0], G[1], k)
+        x_all, y_all = self._get_curve_points(a, b, p)
+
+        fig, ax = plt.subplots(1, 1, figsize=(10, 10))
+        if len(x_all) > raster_threshold:
+            grid = density_raster(x_all, y_all, p)
+            ax.imshow(grid > 0, cmap='Greys', origin='lower', interpolation='nearest',
+                      extent=(-0.5, p - 0.5, -0.5, p - 0.5), aspect='auto', vmax=4)
+        else:
+            ax.scatter(x_all, y_all, c='lightblue', s=30, alpha=0.6, zorder=3, label='Точки кривой')
+
+        ax.grid(True, alpha=0.3)
+        ax.set_xlim(-0.5, p - 0.5)
+        ax.set_ylim(-0.5, p - 0.5)
+        ax.set_xlabel('x', fontsize=14)
+        ax.set_ylabel('y', fontsize=14)
+        ax.set_title(f'Орбита G = {tuple(G)} на y² ≡ x³ + {a}x + {b} (mod {p})',
+                     fontsize=14, weight='bold')
+
+        # Меняются только эти объекты (blit): след орбиты, переход, текущая точка и подпись
+        trail, = ax.plot([], [], 'o', color='red', markersize=4, alpha=0.5, zorder=4, animated=True)
+        jump, = ax.plot([], [], '--', color='gray', linewidth=1, zorder=4, animated=True)
+        current, = ax.plot([], [], '*', color='gold', markersize=18, markeredgecolor='black',
+                           zorder=6, animated=True)
+        label = ax.text(0.02, 0.98, '', transform=ax.transAxes, fontsize=12, va='top',
+                        bbox=dict(boxstyle='round', facecolor='white', alpha=0.9), animated=True)
+        artists = (trail, jump, current, label)
+
+        def init():
+            for artist in artists[:3]:
+                artist.set_data([], [])
+            label.set_text('')
+            return artists
+
+        def update(i):
+            trail.set_data(xs[:i + 1], ys[:i + 1])
+            jump.set_data(xs[max(i - 1, 0):i + 1], ys[max(i - 1, 0):i + 1])
+            current.set_data(xs[i:i + 1], ys[i:i + 1])
+            if np.isnan(xs[i]):
+                label.set_text(f'{i + 1}G = O∞')
+            else:
+                label.set_text(f'{i + 1}G = ({int(xs[i])}, {int(ys[i])})')
+            return artists
+
+        anim = animation.FuncAnimation(fig, update, frames=k, init_func=init,
+                                       interval=1000 / fps, blit=True)
+        self.animations.append(anim)
+        if save_path:
+            self._save_animation(fig, update, artists, k, save_path, fps)
+        return anim
+
+    def animate_real_scalar_multiplication(self, a, b, P, k, x_range=(-3, 5), y_range=(-8, 8),
+                                           fps=10, save_path=None):
+        # Метод хорд и касательных над R: (i+1)P = -R, R - третья точка прямой через iP и P
+        if k < 1:
+            raise ValueError("k должно быть натуральным")
+        x_p, y_p = P
+
+        xs, ys = real_orbit(a, x_p, y_p, k)
+        xs, ys = xs[:, 0], ys[:, 0]
+
+        # Наклоны прямых для всех шагов: касательная при iP = P, иначе хорда; nan - вертикаль
+        prev_x, prev_y = xs[:-1], ys[:-1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            chord = (prev_y - y_p) / (prev_x - x_p)
+            tangent = (3 * x_p**2 + a) / (2 * y_p)
+        slopes = np.where((prev_x == x_p) & (prev_y == y_p), tangent, chord)
+        slopes = np.where(np.isfinite(slopes), slopes, np.nan)
+        line_y = y_p + slopes[:, None] * (np.array(x_range) - x_p)
+
+        fig, ax = plt.subplots(1, 1, figsize=(12, 10))
+        x, y_squared = adaptive_curve_samples(a, b, x_range)
+        self._draw_curve_segments(ax, x, y_squared, a, b)
+        self._setup_basic_plot_styling(ax, x_range, y_range)
+        ax.plot(x_p, y_p, 'ro', markersize=10, label=f'P = ({x_p:.2f}, {y_p:.2f})')
+        ax.set_title(f'Вычисление {k}P методом хорд и касательных', fontsize=16, weight='bold')
+        ax.legend(fontsize=11, loc='upper left')
+
+        line, = ax.plot([], [], 'g--', linewidth=2, alpha=0.8, animated=True)
+        third, = ax.plot([], [], 'go', markersize=9, animated=True)
+        reflect, = ax.plot([], [], ':', color='gray', linewidth=2, animated=True)
+        current, = ax.plot([], [], 'yo', markersize=12, markeredgecolor='black', animated=True)
+        label = ax.text(0.98, 0.02, '', transform=ax.transAxes, fontsize=12, ha='right',
+                        bbox=dict(boxstyle='round', facecolor='lightyellow', alpha=0.9), animated=True)
+        artists = (line, third, reflect, current, label)
+
+        def init():
+            for artist in artists[:4]:
+                artist.set_data([], [])
+            label.set_text('')
+            return artists
+
+        def update(i):
+            if i:
+                line.set_data(x_range, line_y[i - 1])
+                third.set_data(xs[i:i + 1], -ys[i:i + 1])
+                reflect.set_data([xs[i], xs[i]], [-ys[i], ys[i]])
+            else:
+                for artist in (line, third, reflect):
+                    artist.set_data([], [])
+            current.set_data(xs[i:i + 1], ys[i:i + 1])
+            if np.isnan(xs[i]):
+                label.set_text(f'{i + 1}P = O∞')
+            else:
+                label.set_text(f'{i + 1}P = ({xs[i]:.3f}, {ys[i]:.3f})')
+            return artists
+
+        anim = animation.FuncAnimation(fig, update, frames=k, init_func=init,
+                                       interval=1000 / fps, blit=True)
+        self.animations.append(anim)
+        if save_path:
+            self._save_animation(fig, update, artists, k, save_path, fps)
+        return anim
+
 def main():
 
     visualizer = ECCVisualizer()
@@ -337,6 +472,8 @@ def main():
     print("4. visualize_secp256k1() - кривая Bitcoin")
     print("5. visualize_point_doubling() - удвоение точки")
     print("6. visualize_finite_field_curves() - кривые в конечных полях")
+    print("7. animate_scalar_multiplication() - анимация орбиты G, 2G, ..., kG в Fp")
+    print("8. animate_real_scalar_multiplication() - анимация метода хорд и касательных")
 
 
     fig, ax = visualizer.plot_elliptic_curve(
@@ -0,0 +1,263 @@
+import numpy as np
+
+
+def finite_field_points(a, b, p):
+    """
+    Все аффинные точки кривой y² ≡ x³ + ax + b (mod p) за O(p log p)
+    Возвращает массивы xs, ys (по возрастанию x, затем y)
+    """
+    # Таблица квадратов: y² mod p для всех y, упорядоченная по значению квадрата
+    y = np.arange(p, dtype=np.int64)
+    squares = y * y % p
+    order = np.argsort(squares, kind='stable')
+    sorted_squares = squares[order]
+
+    # Правая часть уравнения без переполнения int64 (при p < 2^31)
+    x = np.arange(p, dtype=np.int64)
+    rhs = ((x * x % p) * x + (a % p) * x + b) % p
+
+    # Для каждого x находим корни среди квадратов: их 0, 1 или 2
+    left = np.searchsorted(sorted_squares, rhs, side='left')
+    count = np.searchsorted(sorted_squares, rhs, side='right') - left
+
+    one = count >= 1
+    two = count == 2
+    xs = np.concatenate([x[one], x[two]])
+    ys = np.concatenate([order[left[one]], order[left[two] + 1]])
+
+    sort = np.lexsort((ys, xs))
+    return xs[sort], ys[sort]
+
+
+def density_raster(xs, ys, p, resolution=1024):
+    """
+    Растр плотности точек поля Fp: сетка resolution x resolution (не больше p x p),
+    в ячейке - число точек, попавших в пиксель. Строки - y, столбцы - x
+    """
+    size = min(resolution, p)
+    cols = np.asarray(xs, dtype=np.int64) * size // p
+    rows = np.asarray(ys, dtype=np.int64) * size // p
+    counts = np.bincount(rows * size + cols, minlength=size * size)
+    return counts.reshape(size, size)
+
+
+def real_cubic_roots(a, b):
+    """
+    Действительные корни x³ + ax + b = 0 для массивов коэффициентов a, b
+    в замкнутой форме: тригонометрический метод при трех корнях, формула
+    Кардано при одном. Возвращает массив формы (..., 3): корни по возрастанию
+    (кратный корень повторяется), отсутствующие корни - nan
+    """
+    a, b = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float))
+    roots = np.full(a.shape + (3,), np.nan)
+    # Дискриминант кубического уравнения (со знаком минус): > 0 - один действительный корень
+    d = (b / 2) ** 2 + (a / 3) ** 3
+    scale = np.maximum(1.0, np.maximum(np.abs(a) ** 3, b * b))
+    eps = 1e-12 * scale
+
+    one = d > eps
+    if one.any():
+        sq = np.sqrt(d[one])
+        roots[one, 0] = np.cbrt(-b[one] / 2 + sq) + np.cbrt(-b[one] / 2 - sq)
+
+    three = d < -eps
+    if three.any():
+        m = 2 * np.sqrt(-a[three] / 3)
+        cos_arg = np.clip(3 * b[three] / (a[three] * m), -1.0, 1.0)
+        theta = np.arccos(cos_arg) / 3
+        k = np.arange(3)
+        roots[three] = m[:, None] * np.cos(theta[:, None] - 2 * np.pi * k / 3)
+
+    # d = 0: кратный корень (при a = b = 0 - тройной корень 0)
+    double = ~one & ~three
+    if double.any():
+        ad, bd = a[double], b[double]
+        nonzero = ad != 0
+        simple = np.where(nonzero, 3 * bd / np.where(nonzero, ad, 1), 0.0)
+        repeated = np.where(nonzero, -3 * bd / (2 * np.where(nonzero, ad, 1)), 0.0)
+        roots[double] = np.stack([simple, repeated, repeated], axis=-1)
+
+    return np.sort(roots, axis=-1)
+
+
+def _refine_samples(x, f, scale, max_angle, max_passes):
+    """
+    Сгущение выборки на участках с большой кривизной: пока ломаная y = sqrt(f(x))
+    поворачивает в узле больше чем на max_angle градусов, соседние отрезки делятся пополам
+    """
+    limit = np.radians(max_angle)
+    for _ in range(max_passes):
+        if len(x) < 3:
+            break
+        y = np.sqrt(np.maximum(f(x), 0))
+        angles = np.arctan2(np.diff(y) / scale, np.diff(x) / scale)
+        turn = np.abs(np.angle(np.exp(1j * np.diff(angles))))
+        bad = turn > limit
+        if not bad.any():
+            break
+        split = np.zeros(len(x) - 1, dtype=bool)
+        split[:-1] |= bad
+        split[1:] |= bad
+        x = np.sort(np.concatenate([x, ((x[:-1] + x[1:]) / 2)[split]]))
+    return x
+
+
+def adaptive_curve_samples(a, b, x_range, samples=400, max_angle=2.0, max_passes=6):
+    """
+    Адаптивная выборка x для отрисовки y² = x³ + ax + b на отрезке x_range.
+    Узлы берутся только там, где x³ + ax + b >= 0, и сгущаются к корням
+    (x = корень + O(t²), поэтому шаг по y около вертикальной касательной равномерен)
+    и на участках с большой кривизной. Корни входят в выборку точно (y² = 0),
+    поэтому верхняя и нижняя ветви смыкаются без зазора.
+    Возвращает x и y² = x³ + ax + b; отдельные части кривой разделены nan
+    """
+    lo, hi = x_range
+
+    def f(x):
+        return x**3 + a * x + b
+
+    roots = real_cubic_roots(a, b)
+    roots = np.unique(roots[~np.isnan(roots) & (roots > lo) & (roots < hi)])
+    breaks = np.concatenate([[lo], roots, [hi]])
+
+    pieces = []
+    for left, right in zip(breaks[:-1], breaks[1:]):
+        if f((left + right) / 2) < 0:
+            continue
+        t = np.linspace(0, 1, max(16, int(samples * (right - left) / (hi - lo))))
+        left_root, right_root = left in roots, right in roots
+        if left_root and right_root:
+            g = (1 - np.cos(np.pi * t)) / 2
+        elif left_root:
+            g = 1 - np.cos(np.pi * t / 2)
+        elif right_root:
+            g = np.sin(np.pi * t / 2)
+        else:
+            g = t
+        x = _refine_samples(left + (right - left) * g, f, hi - lo, max_angle, max_passes)
+        if pieces and pieces[-1][-1] == x[0]:
+            # Соседние части сходятся в кратном корне - общая точка не дублируется
+            x = x[1:]
+        elif pieces:
+            pieces.append(np.array([np.nan]))
+        pieces.append(x)
+
+    if not pieces:
+        return np.array([]), np.array([])
+    x = np.concatenate(pieces)
+    y_squared = f(x)
+    # В корнях - точный ноль, остальное не меньше нуля (без ошибок округления)
+    y_squared[np.isin(x, roots)] = 0.0
+    y_squared = np.where(np.isnan(x), np.nan, np.maximum(y_squared, 0.0))
+    return x, y_squared
+
+
+# Арифметика над действительными числами для массивов точек.
+# Точка в бесконечности - (nan, nan): маски обрабатывают ее и вертикальные прямые
+
+
+def real_point_double(a, x, y):
+    """Удвоение массива точек кривой y² = x³ + ax + b над R"""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s = (3 * x * x + a) / (2 * y)
+        x3 = s * s - 2 * x
+        y3 = s * (x - x3) - y
+    # Касательная вертикальна при y = 0: результат - бесконечность
+    infinity = (y == 0) | np.isnan(x)
+    return np.where(infinity, np.nan, x3), np.where(infinity, np.nan, y3)
+
+
+def real_point_add(a, x1, y1, x2, y2):
+    """Попарное сложение массивов точек P + Q над R (как ecc_tool.point_add)"""
+    x1, y1, x2, y2 = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (x1, y1, x2, y2)))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s = (y2 - y1) / (x2 - x1)
+        x3 = s * s - x1 - x2
+        y3 = s * (x1 - x3) - y1
+
+    same_x = x1 == x2
+    doubling = same_x & (y1 == y2)
+    if doubling.any():
+        dx, dy = real_point_double(a, x1, y1)
+        x3 = np.where(doubling, dx, x3)
+        y3 = np.where(doubling, dy, y3)
+    # Вертикальная прямая через P и -P
+    vertical = same_x & ~doubling
+    x3 = np.where(vertical, np.nan, x3)
+    y3 = np.where(vertical, np.nan, y3)
+
+    p_infinity = np.isnan(x1)
+    q_infinity = np.isnan(x2)
+    x3 = np.where(p_infinity, x2, np.where(q_infinity, x1, x3))
+    y3 = np.where(p_infinity, y2, np.where(q_infinity, y1, y3))
+    return x3, y3
+
+
+def real_point_multiply(a, k, x, y):
+    """
+    k*P для массивов точек и скаляров (k - число или целочисленный массив),
+    двоичный метод справа налево одновременно для всех элементов
+    """
+    x, y, k = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float),
+                                  np.asarray(k, dtype=np.int64))
+    # Отрицательный скаляр переносим на точку
+    y = np.where(k < 0, -y, y)
+    k = np.abs(k)
+
+    rx = np.full(x.shape, np.nan)
+    ry = np.full(x.shape, np.nan)
+    while k.any():
+        bit = (k & 1).astype(bool)
+        if bit.any():
+            sx, sy = real_point_add(a, rx, ry, x, y)
+            rx = np.where(bit, sx, rx)
+            ry = np.where(bit, sy, ry)
+        k = k >> 1
+        if k.any():
+            x, y = real_point_double(a, x, y)
+    return rx, ry
+
+
+def real_orbit(a, x, y, count):
+    """
+    Орбиты P, 2P, ..., count*P для массива начальных точек:
+    массивы формы (count, число точек), каждый шаг - одно векторное сложение
+    """
+    x = np.atleast_1d(np.asarray(x, dtype=float))
+    y = np.atleast_1d(np.asarray(y, dtype=float))
+    xs = np.empty((count,) + x.shape)
+    ys = np.empty((count,) + x.shape)
+    cx, cy = x, y
+    for i in range(count):
+        xs[i], ys[i] = cx, cy
+        cx, cy = real_point_add(a, cx, cy, x, y)
+    return xs, ys
+
+
+def finite_field_orbit(a, p, x, y, count):
+    """
+    Орбита G, 2G, ..., count*G на кривой над Fp (G = (x, y)):
+    массивы xs, ys длины count, точка в бесконечности - (nan, nan).
+    Каждый шаг - одно сложение с G (одно обращение по модулю p)
+    """
+    xs = np.full(count, np.nan)
+    ys = np.full(count, np.nan)
+    gx, gy = x % p, y % p
+    cx, cy = gx, gy
+    for i in range(count):
+        if cx is None:
+            cx, cy = gx, gy
+            continue
+        xs[i], ys[i] = cx, cy
+        if cx == gx and (cy + gy) % p == 0:
+            cx = cy = None
+            continue
+        if cx == gx:
+            s = (3 * cx * cx + a) * pow(2 * cy, -1, p) % p
+        else:
+            s = (cy - gy) * pow(cx - gx, -1, p) % p
+        x3 = (s * s - cx - gx) % p
+        cx, cy = x3, (s * (cx - x3) - cy) % p
+    return xs, ys
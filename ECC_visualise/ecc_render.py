@@ -0,0 +1,125 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use('Agg')  # Без окон: plt.show() ничего не делает
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Исходники, от которых зависят рисунки: при их изменении все рисунки перестраиваются
+SOURCES = ('ecc_main.py', 'ecc_points.py', 'ecc_ecdlp_ecdh.py')
+
+# Файл с хешами последней отрисовки (в каталоге static/)
+CACHE_NAME = '.render_cache.json'
+
+# (функция, параметры, файл результата); 'ECCVisualizer.<метод>' - метод визуализатора
+FIGURES = [
+    ('ECCVisualizer.plot_elliptic_curve',
+     dict(a=-1, b=0, title="y² = x³ - x", show_roots=True, save_path='static/test_function.png'),
+     'static/test_function.png'),
+    ('ECCVisualizer.visualize_different_curve_types', {}, 'static/curve_types_comparison.png'),
+    ('ECCVisualizer.visualize_singular_curves', {}, 'static/singular_curves.png'),
+    ('ECCVisualizer.visualize_secp256k1', {}, 'static/secp256k1_curve.png'),
+    ('ECCVisualizer.visualize_point_doubling', {}, 'static/point_doubling.png'),
+    ('ECCVisualizer.visualize_finite_field_curves', dict(p_values=[11, 113, 9679]),
+     'static/finite_field_curves.png'),
+    ('visualize_ecdlp_demonstration', {}, 'static/ecdlp_demonstration.png'),
+    ('visualize_diffie_hellman_steps', {}, 'static/diffie_hellman_steps.png'),
+]
+
+
+def code_hash():
+    """Хеш исходников визуализаторов и версии matplotlib"""
+    digest = hashlib.sha256(matplotlib.__version__.encode())
+    for name in SOURCES:
+        with open(os.path.join(HERE, name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def figure_hash(target, params, code):
+    return hashlib.sha256(json.dumps([target, params, code], sort_keys=True).encode()).hexdigest()
+
+
+def _init_worker(root):
+    sys.path.insert(0, HERE)
+    os.chdir(root)
+
+
+def _render(target, params):
+    """Строит один рисунок (в процессе-воркере). Возвращает время отрисовки"""
+    import matplotlib.pyplot as plt
+
+    start = time.perf_counter()
+    if target.startswith('ECCVisualizer.'):
+        from ecc_main import ECCVisualizer
+        getattr(ECCVisualizer(), target.split('.', 1)[1])(**params)
+    else:
+        import ecc_ecdlp_ecdh
+        getattr(ecc_ecdlp_ecdh, target)(**params)
+    plt.close('all')
+    return time.perf_counter() - start
+
+
+def render_all(root='.', processes=None, force=False):
+    """
+    Отрисовывает все рисунки лекции в root/static в пуле процессов (бэкенд Agg).
+    Рисунок пропускается, если файл существует, а параметры и код визуализаторов
+    не менялись с прошлой отрисовки (force=True перестраивает все).
+    Возвращает словарь файл -> время отрисовки (None - пропущен)
+    """
+    root = os.path.abspath(root)
+    os.makedirs(os.path.join(root, 'static'), exist_ok=True)
+    cache_path = os.path.join(root, 'static', CACHE_NAME)
+    cache = {}
+    if os.path.exists(cache_path) and not force:
+        with open(cache_path) as f:
+            cache = json.load(f)
+
+    code = code_hash()
+    results = {}
+    jobs = []
+    for target, params, output in FIGURES:
+        key = figure_hash(target, params, code)
+        if cache.get(output) == key and os.path.exists(os.path.join(root, output)):
+            results[output] = None
+        else:
+            jobs.append((target, params, output, key))
+
+    if jobs:
+        processes = processes or min(len(jobs), os.cpu_count() or 1)
+        with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(root,)) as pool:
+            futures = [(output, key, pool.submit(_render, target, params))
+                       for target, params, output, key in jobs]
+            for output, key, future in futures:
+                results[output] = future.result()
+                cache[output] = key
+
+        with open(cache_path, 'w') as f:
+            json.dump(cache, f, indent=2, sort_keys=True)
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Отрисовка всех рисунков в static/ без окон")
+    parser.add_argument('--root', default='.', help="каталог, в котором создается static/")
+    parser.add_argument('--processes', type=int, help="число процессов (по умолчанию - по числу рисунков и ядер)")
+    parser.add_argument('--force', action='store_true', help="перестроить все рисунки")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = render_all(args.root, args.processes, args.force)
+    for output, elapsed in results.items():
+        status = 'без изменений' if elapsed is None else f'{elapsed:.2f} с'
+        print(f"{output:<40} {status}")
+    print(f"Всего: {time.perf_counter() - start:.2f} с")
+
+
+if __name__ == "__main__":
+    main()